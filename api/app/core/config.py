@@ -1,5 +1,6 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Optional
 
 
 class Settings(BaseSettings):
@@ -17,6 +18,10 @@ class Settings(BaseSettings):
     TINYFISH_BASE_URL: str = "https://agent.tinyfish.ai"
     TINYFISH_AUTOMATION_ENDPOINT: str = "/api/v1/automation/run"
     TINYFISH_MOCK_MODE: bool = True  # Enable mock mode by default for local dev
+    TINYFISH_MOCK_LATENCY_MIN_S: float = 0.5  # Simulated processing time range in mock mode
+    TINYFISH_MOCK_LATENCY_MAX_S: float = 2.0
+    TINYFISH_MOCK_PREFILL_MS_PER_TOKEN: float = 0.05  # Simulated cost per prompt token
+    TINYFISH_MOCK_DECODE_MS_PER_TOKEN: float = 1.0  # Simulated cost per generated token
     
     # Worker Configuration
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
@@ -25,10 +30,40 @@ class Settings(BaseSettings):
     # Benchmark Settings
     DEFAULT_TIMEOUT_SECONDS: int = 300
     MAX_CONCURRENT_RUNS: int = 5
+    SCHEDULER_RATE_BURST: int = 1  # Run starts a tenant with runs_per_minute may make back to back
+    SWEEP_MAX_RUNS: int = 500  # Largest grid (including repeats) a sweep may expand to
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24  # How long a repeated Idempotency-Key returns the original runs
+    
+    # Tracing (OpenTelemetry)
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "benchmarking-api"
+    TRACING_EXPORTER: str = "console"  # console, file or otlp
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0  # Fraction of traces kept; lower it at high run rates
     
     class Config:
         env_file = ".env"
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Build the settings from the environment on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Stand-in for the Settings instance that defers reading the environment
+    (and ``.env``) until an attribute is first accessed. Importing app.main
+    accesses it straight away; the worker and scripts only when they need it.
+    """
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+
+settings = _LazySettings()
@@ -1,14 +1,48 @@
+import threading
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+_sessionmaker = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
+def get_engine() -> Engine:
+    """
+    Create the database engine on first use.
+
+    Deferring it keeps the DB driver import and URL parsing out of module
+    import, so the app (and scripts importing the models) start faster.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # SQLite (used for local benchmarking) rejects cross-thread use by default,
+                # but background tasks run on a different thread than the request handler.
+                connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+                _engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+    return _engine
+
+
+def SessionLocal() -> Session:
+    """Open a session bound to the (lazily created) engine."""
+    return _sessionmaker(bind=get_engine())
+
+
+def __getattr__(name: str):
+    # Keeps ``from app.core.database import engine`` working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db():
     """Dependency for database sessions."""
     db = SessionLocal()
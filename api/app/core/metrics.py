@@ -0,0 +1,145 @@
+"""Prometheus metrics for the API and the benchmark executor."""
+import time
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+from .database import get_engine
+
+# Route latency stays in the sub-second range; TinyFish calls can run up to
+# DEFAULT_TIMEOUT_SECONDS, so they get their own, wider buckets.
+ROUTE_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UPSTREAM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Queue waits range from near zero when idle to minutes behind a large sweep
+QUEUE_WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template.",
+    ["method", "route", "status"],
+    buckets=ROUTE_LATENCY_BUCKETS,
+)
+
+TINYFISH_CALL_DURATION = Histogram(
+    "tinyfish_call_duration_seconds",
+    "Duration of TinyFish automation calls.",
+    ["mode", "outcome"],
+    buckets=UPSTREAM_LATENCY_BUCKETS,
+)
+
+TINYFISH_TTFT = Histogram(
+    "tinyfish_ttft_seconds",
+    "Time to first token reported for TinyFish automation calls.",
+    ["mode"],
+    buckets=UPSTREAM_LATENCY_BUCKETS,
+)
+
+TINYFISH_ERRORS = Counter(
+    "tinyfish_errors_total",
+    "Failed TinyFish automation calls by error type.",
+    ["mode", "error_type"],
+)
+
+RUNS_TOTAL = Counter(
+    "benchmark_runs_total",
+    "Finished benchmark runs by status and automation.",
+    ["status", "automation"],
+)
+
+RUNS_IN_FLIGHT = Gauge(
+    "benchmark_runs_in_flight",
+    "Benchmark runs currently executing.",
+)
+
+EXECUTOR_QUEUE_LENGTH = Gauge(
+    "benchmark_executor_queue_length",
+    "Triggered benchmark runs waiting to start executing.",
+)
+
+# Per-tenant scheduling; the tenant label is the tenant id, or "default" for
+# automations without a tenant
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    "scheduler_queue_depth",
+    "Runs queued in the fair scheduler, per tenant.",
+    ["tenant"],
+)
+
+SCHEDULER_RUNNING = Gauge(
+    "scheduler_running_runs",
+    "Runs started by the fair scheduler and still executing, per tenant.",
+    ["tenant"],
+)
+
+SCHEDULER_WAIT = Histogram(
+    "scheduler_wait_seconds",
+    "Time runs spent queued in the fair scheduler before starting, per tenant.",
+    ["tenant"],
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+
+
+class DatabasePoolCollector:
+    """Expose SQLAlchemy connection pool state at scrape time."""
+
+    _STATS = (
+        ("size", "size", "Configured size of the connection pool."),
+        ("checked_out", "checkedout", "Connections currently checked out of the pool."),
+        ("checked_in", "checkedin", "Idle connections held by the pool."),
+        ("overflow", "overflow", "Connections opened beyond the configured pool size."),
+    )
+
+    def describe(self):
+        # Without this, registering the collector calls collect() and so would
+        # create the engine at import time
+        return []
+
+    def collect(self):
+        pool = get_engine().pool
+        for name, method_name, documentation in self._STATS:
+            # Not every pool class (e.g. SQLite's) implements every statistic
+            method = getattr(pool, method_name, None)
+            if method is None:
+                continue
+            metric = GaugeMetricFamily(f"db_pool_{name}", documentation)
+            metric.add_metric([], float(method()))
+            yield metric
+
+
+REGISTRY.register(DatabasePoolCollector())
+
+
+class PrometheusMiddleware:
+    """
+    Record request latency per route template.
+
+    Implemented as plain ASGI middleware so streaming responses are not
+    buffered and the per-request overhead stays at a couple of microseconds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template rather than raw path to keep cardinality bounded
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - start)
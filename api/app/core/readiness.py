@@ -0,0 +1,74 @@
+"""
+Startup warm-up and readiness.
+
+The API starts serving (and /health answers) as soon as the app is imported;
+the warm-up then runs in a background thread, opening the database pool's
+connections and loading the dependencies that are imported lazily. /ready
+reports ready only once that has succeeded, so load balancers and
+autoscalers don't route traffic to a cold instance.
+"""
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from .config import settings
+from .database import get_engine
+
+# Imported lazily on the request path; loaded here before reporting ready
+LAZY_MODULES = ("numpy", "httpx")
+
+_ready = threading.Event()
+_state: Dict[str, Any] = {"error": None, "warmup_ms": None}
+
+
+def _warm_pool() -> int:
+    """Open as many connections as runs may use at once and return them to the pool."""
+    engine = get_engine()
+    size = getattr(engine.pool, "size", lambda: 1)()
+    connections = []
+    try:
+        for _ in range(max(1, min(size, settings.MAX_CONCURRENT_RUNS))):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def warm_up(retry_interval: float = 1.0, stop: Optional[threading.Event] = None) -> None:
+    """Warm the pools, retrying until the database is reachable or ``stop`` is set."""
+    start = time.perf_counter()
+    while stop is None or not stop.is_set():
+        try:
+            _state["connections"] = _warm_pool()
+            for module in LAZY_MODULES:
+                importlib.import_module(module)
+        except Exception as e:
+            _state["error"] = f"{type(e).__name__}: {e}"
+            time.sleep(retry_interval)
+            continue
+        _state["error"] = None
+        _state["warmup_ms"] = (time.perf_counter() - start) * 1000
+        _ready.set()
+        return
+
+
+def start_warm_up() -> threading.Event:
+    """Run warm_up() in a daemon thread; set the returned event to give up."""
+    stop = threading.Event()
+    threading.Thread(target=warm_up, kwargs={"stop": stop}, name="warm-up", daemon=True).start()
+    return stop
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def readiness() -> Dict[str, Any]:
+    """Readiness details for the /ready endpoint."""
+    return {"ready": is_ready(), **_state}
@@ -0,0 +1,93 @@
+"""OpenTelemetry tracing for the API, the benchmark executor and TinyFish calls."""
+import json
+import threading
+from typing import Dict, Optional
+
+from opentelemetry import propagate, trace
+
+from .config import settings
+from .database import get_engine
+
+# Spans are no-ops until setup_tracing() installs an SDK tracer provider
+tracer = trace.get_tracer("app")
+
+
+def inject_trace_context() -> Dict[str, str]:
+    """Serialize the current trace context so it can cross a queue boundary."""
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+def extract_trace_context(carrier: Optional[Dict[str, str]]):
+    """Rebuild a trace context serialized by inject_trace_context()."""
+    return propagate.extract(carrier or {})
+
+
+def _file_exporter_class():
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class FileSpanExporter(SpanExporter):
+        """Append finished spans to a file as JSON lines, for offline inspection."""
+
+        def __init__(self, path: str):
+            self._file = open(path, "a")
+            self._lock = threading.Lock()
+
+        def export(self, spans):
+            with self._lock:
+                for span in spans:
+                    self._file.write(json.dumps(json.loads(span.to_json())) + "\n")
+                self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            self._file.close()
+
+    return FileSpanExporter
+
+
+def _build_exporter():
+    exporter = settings.TRACING_EXPORTER.lower()
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if exporter == "file":
+        return _file_exporter_class()(settings.TRACING_FILE_PATH)
+    if exporter == "otlp":
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
+
+
+def setup_tracing(app) -> None:
+    """
+    Install the tracer provider and instrument FastAPI, SQLAlchemy and httpx.
+
+    Does nothing unless TRACING_ENABLED is set. Sampling is decided once per
+    trace at the root (TRACING_SAMPLE_RATIO) and inherited by child spans,
+    including the executor spans continued from a propagated context.
+    """
+    if not settings.TRACING_ENABLED:
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(_build_exporter()))
+    trace.set_tracer_provider(provider)
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="health,ready,metrics")
+    SQLAlchemyInstrumentor().instrument(engine=get_engine())
+    # Injects traceparent headers into outgoing TinyFish requests
+    HTTPXClientInstrumentor().instrument()
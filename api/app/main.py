@@ -1,9 +1,28 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.core.config import settings
-from app.routes import automations, scenarios, runs
+from app.core.metrics import PrometheusMiddleware
+from app.core.readiness import readiness, start_warm_up
+from app.core.serialization import FastJSONResponse
+from app.core.tracing import setup_tracing
+from app.routes import automations, scenarios, runs, tenants
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the pools in the background so startup isn't blocked; /ready tracks it
+    stop_warm_up = start_warm_up()
+    yield
+    stop_warm_up.set()
+
+
+# Building the app reads the settings (title, router prefixes, tracing), so
+# they are only deferred for modules imported without app.main: the worker
+# and scripts. orjson encodes several times faster than the stdlib encoder.
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -14,7 +33,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency metrics
+app.add_middleware(PrometheusMiddleware)
+
+# Distributed tracing (no-op unless TRACING_ENABLED)
+setup_tracing(app)
+
 # Include routers
+app.include_router(tenants.router, prefix=f"{settings.API_V1_STR}/tenants", tags=["tenants"])
 app.include_router(automations.router, prefix=f"{settings.API_V1_STR}/automations", tags=["automations"])
 app.include_router(scenarios.router, prefix=f"{settings.API_V1_STR}/scenarios", tags=["scenarios"])
 app.include_router(runs.router, prefix=f"{settings.API_V1_STR}/runs", tags=["runs"])
@@ -30,6 +56,19 @@ def health_check():
     }
 
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness endpoint: 503 until the database pool and lazy imports are warm."""
+    state = readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
@@ -1,14 +1,30 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Float, ForeignKey, Text, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
+class Tenant(Base):
+    """A team or project sharing the deployment, with its run scheduling quotas."""
+    __tablename__ = "tenants"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(255), nullable=False, unique=True)
+    weight = Column(Float, nullable=False, default=1.0)  # Fair-queueing share
+    max_concurrent_runs = Column(Integer, nullable=True)  # None: up to the global MAX_CONCURRENT_RUNS
+    runs_per_minute = Column(Integer, nullable=True)  # Run start rate; None: unlimited
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    automations = relationship("Automation", back_populates="tenant")
+
+
 class Automation(Base):
     """TinyFish automation configuration."""
     __tablename__ = "automations"
     
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     tinyfish_automation_id = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -16,6 +32,7 @@ class Automation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    tenant = relationship("Tenant", back_populates="automations")
     scenarios = relationship("Scenario", back_populates="automation")
 
 
@@ -26,9 +43,12 @@ class Scenario(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     automation_id = Column(Integer, ForeignKey("automations.id"), nullable=False)
+    # Always the automation's tenant; stored to filter and schedule without a join
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, index=True)
     description = Column(Text, nullable=True)
     inputs_template = Column(JSON, nullable=True, default={})
     run_settings = Column(JSON, nullable=True, default={})  # interval, concurrency, etc.
+    steps = Column(JSON, nullable=True)  # Multi-step pipeline DAG, see app.services.pipeline
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -51,6 +71,19 @@ class Run(Base):
     ttft_ms = Column(Float, nullable=True)  # Time to First Token
     inter_token_stats = Column(JSON, nullable=True)  # {mean_ms, p50_ms, p95_ms, p99_ms}
     
+    # Per-phase timings: {queue_ms, client_setup_ms, dns_connect_ms, tls_ms, send_ms, ttfb_ms,
+    # time_to_headers_ms, download_ms, call_ms, overhead_ms}
+    timing_breakdown = Column(JSON, nullable=True)
+    
+    # Sampled runs: {duration_ms: [...], ttft_ms: [...], warmup_ms: [...], outliers: [...],
+    # failures, ci95_ms: [lo, hi], converged}
+    samples = Column(JSON, nullable=True)
+    
+    # Sweep runs: the sweep they belong to and their grid point
+    # {prompt_tokens, max_tokens, temperature}
+    sweep_id = Column(String(64), nullable=True, index=True)
+    sweep_params = Column(JSON, nullable=True)
+    
     error = Column(Text, nullable=True)
     tinyfish_run_id = Column(String(255), nullable=True)
     response_json = Column(JSON, nullable=True)
@@ -58,3 +91,43 @@ class Run(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     scenario = relationship("Scenario", back_populates="runs")
+    steps = relationship("RunStep", back_populates="run", cascade="all, delete-orphan")
+
+
+class RunStep(Base):
+    """Execution of a single step of a multi-step scenario run."""
+    __tablename__ = "run_steps"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("runs.id"), nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    automation_id = Column(Integer, ForeignKey("automations.id"), nullable=True)
+    depends_on = Column(JSON, nullable=True)  # names of upstream steps
+    status = Column(String(50), nullable=False, default="pending")  # pending, completed, failed, skipped
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    start_offset_ms = Column(Float, nullable=True)  # relative to the start of the run
+    duration_ms = Column(Float, nullable=True)
+    ttft_ms = Column(Float, nullable=True)
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    on_critical_path = Column(Boolean, nullable=False, default=False)
+    timing_breakdown = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    response_json = Column(JSON, nullable=True)
+    
+    run = relationship("Run", back_populates="steps")
+
+
+class IdempotencyKey(Base):
+    """Client Idempotency-Key of a run trigger and the runs it created, kept until expires_at."""
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), nullable=False, unique=True)
+    endpoint = Column(String(64), nullable=False)  # trigger or sweep
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the endpoint and request body
+    run_ids = Column(JSON, nullable=False)
+    sweep_id = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,18 +1,85 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
-from app.models.models import Automation as AutomationModel
+from app.core.serialization import rows_response, schema_columns
+from app.models.models import (
+    Automation as AutomationModel,
+    RunStep as RunStepModel,
+    Scenario as ScenarioModel,
+    Tenant as TenantModel,
+)
 from app.schemas.schemas import Automation, AutomationCreate, AutomationUpdate
+from app.services.pipeline import step_automation_ids
 
 router = APIRouter()
 
 
+def _validate_tenant(tenant_id: Optional[int], db: Session):
+    if tenant_id is not None and db.query(TenantModel.id).filter(TenantModel.id == tenant_id).first() is None:
+        raise HTTPException(status_code=422, detail=f"Tenant not found: {tenant_id}")
+
+
+def _validate_tenant_move(automation_id: int, tenant_id: Optional[int], db: Session):
+    """
+    Reject moving an automation to another tenant when a pipeline would then
+    use another tenant's automations: one of the automation's own scenarios
+    (which move with it) or a scenario that uses it in a step.
+    """
+    affected = []
+    for scenario_id, scenario_automation_id, scenario_tenant_id, steps in db.query(
+        ScenarioModel.id, ScenarioModel.automation_id, ScenarioModel.tenant_id, ScenarioModel.steps
+    ):
+        step_ids = step_automation_ids(steps)
+        if scenario_automation_id == automation_id:
+            affected.append((scenario_id, tenant_id, step_ids))
+        elif automation_id in step_ids:
+            affected.append((scenario_id, scenario_tenant_id, step_ids))
+    
+    used = set().union(*(step_ids for _, _, step_ids in affected)) - {automation_id}
+    owners = dict(db.query(AutomationModel.id, AutomationModel.tenant_id).filter(AutomationModel.id.in_(used)))
+    owners[automation_id] = tenant_id
+    conflicts = sorted(
+        scenario_id for scenario_id, owner, step_ids in affected
+        if any(owners.get(step_id, owner) != owner for step_id in step_ids)
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Pipeline scenarios would use another tenant's automations: {', '.join(map(str, conflicts))}"
+        )
+
+
+def _validate_unused(automation_id: int, db: Session):
+    """Reject deleting an automation that scenarios, pipeline steps or recorded run steps still use."""
+    users = [
+        scenario_id for scenario_id, scenario_automation_id, steps in db.query(
+            ScenarioModel.id, ScenarioModel.automation_id, ScenarioModel.steps
+        )
+        if scenario_automation_id == automation_id or automation_id in step_automation_ids(steps)
+    ]
+    if users:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Automation is used by scenarios: {', '.join(map(str, sorted(users)))}"
+        )
+    if db.query(RunStepModel.id).filter(RunStepModel.automation_id == automation_id).first() is not None:
+        raise HTTPException(status_code=409, detail="Automation has recorded pipeline run steps")
+
+
 @router.get("/", response_model=List[Automation])
-def list_automations(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all automations."""
-    automations = db.query(AutomationModel).offset(skip).limit(limit).all()
-    return automations
+def list_automations(
+    skip: int = 0,
+    limit: int = 100,
+    tenant_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """List all automations, optionally filtered by tenant_id."""
+    query = db.query(*schema_columns(AutomationModel, Automation))
+    if tenant_id:
+        query = query.filter(AutomationModel.tenant_id == tenant_id)
+    rows = query.offset(skip).limit(limit).all()
+    return rows_response(rows, Automation)
 
 
 @router.get("/{automation_id}", response_model=Automation)
@@ -27,6 +94,7 @@ def get_automation(automation_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=Automation)
 def create_automation(automation: AutomationCreate, db: Session = Depends(get_db)):
     """Create a new automation."""
+    _validate_tenant(automation.tenant_id, db)
     db_automation = AutomationModel(**automation.model_dump())
     db.add(db_automation)
     db.commit()
@@ -44,6 +112,13 @@ def update_automation(
         raise HTTPException(status_code=404, detail="Automation not found")
     
     update_data = automation.model_dump(exclude_unset=True)
+    if "tenant_id" in update_data and update_data["tenant_id"] != db_automation.tenant_id:
+        _validate_tenant(update_data["tenant_id"], db)
+        _validate_tenant_move(automation_id, update_data["tenant_id"], db)
+        # Scenarios follow their automation to the new tenant
+        db.query(ScenarioModel).filter(ScenarioModel.automation_id == automation_id).update(
+            {ScenarioModel.tenant_id: update_data["tenant_id"]}, synchronize_session=False
+        )
     for key, value in update_data.items():
         setattr(db_automation, key, value)
     
@@ -54,10 +129,11 @@ def update_automation(
 
 @router.delete("/{automation_id}")
 def delete_automation(automation_id: int, db: Session = Depends(get_db)):
-    """Delete an automation."""
+    """Delete an automation that no scenario or recorded run step uses."""
     db_automation = db.query(AutomationModel).filter(AutomationModel.id == automation_id).first()
     if db_automation is None:
         raise HTTPException(status_code=404, detail="Automation not found")
+    _validate_unused(automation_id, db)
     
     db.delete(db_automation)
     db.commit()
@@ -1,16 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from uuid import uuid4
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.models import Run as RunModel, Scenario as ScenarioModel
-from app.schemas.schemas import Run, TriggerRunRequest, DashboardKPIs, PercentileStats
+from app.core.metrics import EXECUTOR_QUEUE_LENGTH
+from app.core.serialization import FastJSONResponse, row_dicts, rows_response, schema_columns
+from app.core.tracing import inject_trace_context
+from app.models.models import (
+    Automation as AutomationModel,
+    IdempotencyKey as IdempotencyKeyModel,
+    Run as RunModel,
+    RunStep as RunStepModel,
+    Scenario as ScenarioModel,
+    Tenant as TenantModel,
+)
+from app.schemas.schemas import (
+    Run,
+    RunStep,
+    ScalingFit,
+    StepStats,
+    SweepRequest,
+    SweepResponse,
+    TriggerRunRequest,
+    DashboardKPIs,
+    PercentileStats,
+)
 from app.services.benchmark_service import execute_benchmark_run
-import numpy as np
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    STREAMERS,
+    apply_run_filters,
+    export_columns,
+    iter_run_batches,
+)
+from app.services.idempotency import find_key, record_key, request_hash
+from app.services.pipeline import estimate_tokens
+from app.services.sampling import kept_values
+from app.services.scheduler import TenantQuota, scheduler
+from app.services.sweep import expand_grid, fit_scaling, grid_size, output_tokens, sweep_inputs
 
 router = APIRouter()
 
+# Runs whose timing_breakdown feeds the dashboard's per-phase percentiles
+TIMING_STATS_WINDOW = 10_000
+
+
+def _percentile_stats(values: List[float]) -> PercentileStats:
+    """Compute p50/p95/p99 for a list of values."""
+    if not values:
+        return PercentileStats()
+    # NumPy is imported on first use to keep it out of API startup
+    import numpy as np
+    
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return PercentileStats(p50=float(p50), p95=float(p95), p99=float(p99))
+
 
 @router.get("/", response_model=List[Run])
 def list_runs(
@@ -18,17 +67,88 @@ def list_runs(
     limit: int = 100,
     scenario_id: Optional[int] = None,
     status: Optional[str] = None,
+    tenant_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """List all runs with optional filtering."""
-    query = db.query(RunModel)
-    if scenario_id:
-        query = query.filter(RunModel.scenario_id == scenario_id)
-    if status:
-        query = query.filter(RunModel.status == status)
+    query = apply_run_filters(db.query(*schema_columns(RunModel, Run)), scenario_id, status, tenant_id)
+    rows = query.order_by(desc(RunModel.created_at)).offset(skip).limit(limit).all()
+    return rows_response(rows, Run)
+
+
+@router.get("/export")
+def export_runs(
+    format: str = Query("csv", pattern="^(csv|jsonl|parquet)$"),
+    scenario_id: Optional[int] = None,
+    status: Optional[str] = None,
+    response_json: str = Query("omit", pattern="^(omit|raw|flatten)$"),
+    tenant_id: Optional[int] = None
+):
+    """
+    Export run history as CSV, JSON lines or Parquet.
     
-    runs = query.order_by(desc(RunModel.created_at)).offset(skip).limit(limit).all()
-    return runs
+    Accepts the same filters as the run list. Rows are streamed from a
+    server-side cursor in id order, so memory use stays constant however many
+    runs are exported. ``response_json`` can be omitted, included as-is, or
+    flattened into dotted columns.
+    """
+    batches = iter_run_batches(
+        scenario_id=scenario_id, status=status, response_json=response_json, tenant_id=tenant_id
+    )
+    return StreamingResponse(
+        STREAMERS[format](batches, export_columns(response_json)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="runs.{format}"'}
+    )
+
+
+@router.get("/scaling", response_model=List[ScalingFit])
+def get_scaling_fits(
+    automation_id: Optional[int] = None,
+    sweep_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Fit latency against prompt and output size from completed sweep runs,
+    per automation: TTFT gives the prefill slope, total latency the decode slope.
+    """
+    query = db.query(
+        ScenarioModel.automation_id,
+        RunModel.sweep_params,
+        RunModel.response_json,
+        RunModel.ttft_ms,
+        RunModel.total_duration_ms,
+    ).join(ScenarioModel, RunModel.scenario_id == ScenarioModel.id).filter(
+        RunModel.sweep_id.isnot(None),
+        RunModel.status == "completed",
+        RunModel.total_duration_ms.isnot(None)
+    )
+    if automation_id is not None:
+        query = query.filter(ScenarioModel.automation_id == automation_id)
+    if sweep_id is not None:
+        query = query.filter(RunModel.sweep_id == sweep_id)
+    
+    import numpy as np
+    
+    rows: Dict[int, list] = {}
+    for automation, params, response_json, ttft, total in query:
+        generated = output_tokens(response_json, params.get("max_tokens"))
+        if generated is None:
+            continue
+        rows.setdefault(automation, []).append(
+            (params["prompt_tokens"], generated, np.nan if ttft is None else ttft, total)
+        )
+    
+    names = dict(db.query(AutomationModel.id, AutomationModel.name).filter(AutomationModel.id.in_(rows)))
+    fits = []
+    for automation, values in sorted(rows.items()):
+        prompt, generated, ttft, total = np.array(values, dtype=float).T
+        fits.append(ScalingFit(
+            automation_id=automation,
+            automation_name=names.get(automation, ""),
+            **fit_scaling(prompt, generated, ttft, total)
+        ))
+    return fits
 
 
 @router.get("/{run_id}", response_model=Run)
@@ -40,13 +160,71 @@ def get_run(run_id: int, db: Session = Depends(get_db)):
     return run
 
 
+def _tenant_quota(scenario: ScenarioModel, db: Session) -> TenantQuota:
+    """Scheduling quota of the tenant owning a scenario."""
+    tenant = None
+    if scenario.tenant_id is not None:
+        tenant = db.query(TenantModel).filter(TenantModel.id == scenario.tenant_id).first()
+    return TenantQuota.of(tenant)
+
+
+def _replayed(
+    db: Session,
+    key: str,
+    hash_: str,
+    response: Response
+) -> Optional[IdempotencyKeyModel]:
+    """The earlier request made with an Idempotency-Key, if any; it must have had the same body."""
+    record = find_key(db, key)
+    if record is None:
+        return None
+    if record.request_hash != hash_:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    response.headers["Idempotent-Replayed"] = "true"
+    return record
+
+
+def _commit_runs(db: Session, key: Optional[str], hash_: str, response: Response) -> Optional[IdempotencyKeyModel]:
+    """
+    Commit new runs with their Idempotency-Key. If a concurrent request with
+    the same key committed first, drop these runs and return its record.
+    """
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        record = _replayed(db, key, hash_, response) if key else None
+        if record is None:
+            raise
+        return record
+    return None
+
+
+def _replayed_run(db: Session, record: IdempotencyKeyModel) -> RunModel:
+    run = db.query(RunModel).filter(RunModel.id == record.run_ids[0]).first()
+    if run is None:
+        # The run id stored with the key no longer resolves to a run
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
 @router.post("/trigger", response_model=Run)
 async def trigger_run(
     request: TriggerRunRequest,
-    background_tasks: BackgroundTasks,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db)
 ):
-    """Trigger a new benchmark run."""
+    """
+    Trigger a new benchmark run. Repeating a request with the same
+    Idempotency-Key returns the run it created instead of starting another.
+    """
+    hash_ = request_hash("trigger", request) if idempotency_key else None
+    if idempotency_key:
+        record = _replayed(db, idempotency_key, hash_, response)
+        if record is not None:
+            return _replayed_run(db, record)
+    
     # Verify scenario exists
     scenario = db.query(ScenarioModel).filter(ScenarioModel.id == request.scenario_id).first()
     if scenario is None:
@@ -59,20 +237,112 @@ async def trigger_run(
         created_at=datetime.utcnow()
     )
     db.add(db_run)
-    db.commit()
+    if idempotency_key:
+        db.flush()
+        record_key(db, idempotency_key, "trigger", hash_, [db_run.id])
+    record = _commit_runs(db, idempotency_key, hash_, response)
+    if record is not None:
+        return _replayed_run(db, record)
     db.refresh(db_run)
     
-    # Execute benchmark in background
-    background_tasks.add_task(
+    # Queue for execution, fairly shared with other tenants' runs
+    EXECUTOR_QUEUE_LENGTH.inc()
+    scheduler.submit(
+        scenario.tenant_id,
+        _tenant_quota(scenario, db),
         execute_benchmark_run,
         run_id=db_run.id,
         scenario_id=request.scenario_id,
-        inputs_override=request.inputs_override
+        inputs_override=request.inputs_override,
+        trace_context=inject_trace_context()
     )
     
     return db_run
 
 
+@router.post("/sweep", response_model=SweepResponse)
+async def trigger_sweep(
+    request: SweepRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Expand a parameter grid into runs of a scenario and queue them; they run
+    concurrently within the tenant's quotas and the global MAX_CONCURRENT_RUNS.
+    Repeating a request with the same Idempotency-Key returns the same sweep.
+    """
+    hash_ = request_hash("sweep", request) if idempotency_key else None
+    if idempotency_key:
+        record = _replayed(db, idempotency_key, hash_, response)
+        if record is not None:
+            return SweepResponse(sweep_id=record.sweep_id, run_ids=record.run_ids)
+    
+    scenario = db.query(ScenarioModel).filter(ScenarioModel.id == request.scenario_id).first()
+    if scenario is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    if scenario.steps:
+        raise HTTPException(status_code=422, detail="Sweeps are not supported for pipeline scenarios")
+    
+    # Sized before expanding, so an oversized grid is rejected without building it
+    grid = request.grid.model_dump()
+    size = grid_size(grid, request.repeats)
+    if not size:
+        raise HTTPException(status_code=422, detail="Sweep grid is empty")
+    if size > settings.SWEEP_MAX_RUNS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Sweep expands to {size} runs; the limit is {settings.SWEEP_MAX_RUNS}"
+        )
+    points = expand_grid(grid, request.repeats)
+    
+    automation = db.query(AutomationModel).filter(AutomationModel.id == scenario.automation_id).first()
+    base_inputs = {
+        **automation.default_inputs,
+        **scenario.inputs_template,
+        **(request.inputs_override or {})
+    }
+    sweep_id = uuid4().hex
+    created_at = datetime.utcnow()
+    runs = []
+    for point in points:
+        inputs = sweep_inputs(base_inputs, point)
+        # Record the prompt size even when it was not swept, for the scaling fit
+        params = {**point, "prompt_tokens": point.get("prompt_tokens", estimate_tokens(inputs.get("prompt") or ""))}
+        run = RunModel(
+            scenario_id=scenario.id,
+            status="pending",
+            created_at=created_at,
+            sweep_id=sweep_id,
+            sweep_params=params
+        )
+        db.add(run)
+        runs.append((run, inputs))
+    db.flush()
+    pending = [(run.id, inputs) for run, inputs in runs]
+    if idempotency_key:
+        record_key(db, idempotency_key, "sweep", hash_, [run_id for run_id, _ in pending], sweep_id)
+    record = _commit_runs(db, idempotency_key, hash_, response)
+    if record is not None:
+        return SweepResponse(sweep_id=record.sweep_id, run_ids=record.run_ids)
+    
+    EXECUTOR_QUEUE_LENGTH.inc(len(pending))
+    quota = _tenant_quota(scenario, db)
+    trace_context = inject_trace_context()
+    for run_id, inputs in pending:
+        scheduler.submit(
+            scenario.tenant_id,
+            quota,
+            execute_benchmark_run,
+            run_id=run_id,
+            scenario_id=scenario.id,
+            inputs_override=inputs,
+            trace_context=trace_context
+        )
+    
+    return SweepResponse(sweep_id=sweep_id, run_ids=[run_id for run_id, _ in pending])
+
+
 @router.get("/kpis/dashboard", response_model=DashboardKPIs)
 def get_dashboard_kpis(db: Session = Depends(get_db)):
     """Get aggregated KPIs for dashboard."""
@@ -84,45 +354,111 @@ def get_dashboard_kpis(db: Session = Depends(get_db)):
     success_rate = (completed_runs / total_runs * 100) if total_runs > 0 else 0
     
     # Total time percentiles
-    completed_durations = db.query(RunModel.total_duration_ms).filter(
-        RunModel.status == "completed",
-        RunModel.total_duration_ms.isnot(None)
-    ).all()
+    completed = (RunModel.status == "completed", RunModel.total_duration_ms.isnot(None))
+    durations = [
+        duration for (duration,) in db.query(RunModel.total_duration_ms).filter(
+            *completed, RunModel.samples.is_(None)
+        )
+    ]
     
-    durations = [d[0] for d in completed_durations if d[0] is not None]
+    # Sampled runs contribute every kept sample rather than their median
+    for (samples,) in db.query(RunModel.samples).filter(*completed, RunModel.samples.isnot(None)):
+        durations.extend(kept_values(samples))
     
-    if durations:
-        total_time_stats = PercentileStats(
-            p50=float(np.percentile(durations, 50)),
-            p95=float(np.percentile(durations, 95)),
-            p99=float(np.percentile(durations, 99))
-        )
-    else:
-        total_time_stats = PercentileStats()
+    total_time_stats = _percentile_stats(durations)
     
     # Recent runs
-    recent_runs = db.query(RunModel).order_by(desc(RunModel.created_at)).limit(10).all()
+    recent_runs = db.query(*schema_columns(RunModel, Run)).order_by(desc(RunModel.created_at)).limit(10).all()
     
     # TTFT stats (streaming-ready, will show N/A for now)
-    ttft_values = db.query(RunModel.ttft_ms).filter(
-        RunModel.ttft_ms.isnot(None)
-    ).all()
+    ttft_list = [
+        ttft for (ttft,) in db.query(RunModel.ttft_ms).filter(
+            RunModel.ttft_ms.isnot(None), RunModel.samples.is_(None)
+        )
+    ]
+    for (samples,) in db.query(RunModel.samples).filter(
+        RunModel.ttft_ms.isnot(None), RunModel.samples.isnot(None)
+    ):
+        ttft_list.extend(kept_values(samples, "ttft_ms"))
+    
+    ttft_stats = _percentile_stats(ttft_list) if ttft_list else None
+    
+    # Per-phase timing percentiles, to separate our overhead from provider
+    # latency, over the most recent runs so the JSON load stays bounded
+    breakdowns = db.query(RunModel.timing_breakdown).filter(
+        RunModel.timing_breakdown.isnot(None)
+    ).order_by(desc(RunModel.id)).limit(TIMING_STATS_WINDOW).all()
     
-    ttft_stats = None
-    if ttft_values and len(ttft_values) > 0:
-        ttft_list = [t[0] for t in ttft_values if t[0] is not None]
-        if ttft_list:
-            ttft_stats = PercentileStats(
-                p50=float(np.percentile(ttft_list, 50)),
-                p95=float(np.percentile(ttft_list, 95)),
-                p99=float(np.percentile(ttft_list, 99))
-            )
-    
-    return DashboardKPIs(
+    phase_values: Dict[str, List[float]] = {}
+    for (breakdown,) in breakdowns:
+        for phase, value in (breakdown or {}).items():
+            if value is not None:
+                phase_values.setdefault(phase, []).append(value)
+    timing_breakdown_stats = {
+        phase: _percentile_stats(values) for phase, values in sorted(phase_values.items())
+    }
+    
+    kpis = DashboardKPIs(
         total_runs=total_runs,
         success_rate=success_rate,
         total_time_stats=total_time_stats,
         ttft_stats=ttft_stats,
         avg_inter_token_latency=None,  # Streaming-ready
-        recent_runs=recent_runs
-    )
+        timing_breakdown_stats=timing_breakdown_stats,
+        recent_runs=[]
+    ).model_dump()
+    # Recent runs skip per-object validation, like the run list
+    kpis["recent_runs"] = row_dicts(recent_runs, Run)
+    return FastJSONResponse(kpis)
+
+
+@router.get("/kpis/steps", response_model=List[StepStats])
+def get_step_kpis(scenario_id: int, db: Session = Depends(get_db)):
+    """
+    Per-step latency and token statistics for a multi-step scenario, with the
+    share of runs in which each step was on the critical path.
+    """
+    steps = db.query(
+        RunStepModel.name,
+        RunStepModel.status,
+        RunStepModel.duration_ms,
+        RunStepModel.ttft_ms,
+        RunStepModel.input_tokens,
+        RunStepModel.output_tokens,
+        RunStepModel.on_critical_path,
+    ).join(RunModel, RunStepModel.run_id == RunModel.id).filter(
+        RunModel.scenario_id == scenario_id,
+        RunModel.status == "completed"
+    ).all()
+    
+    by_name: Dict[str, list] = {}
+    for step in steps:
+        by_name.setdefault(step.name, []).append(step)
+    
+    def mean(values):
+        values = [v for v in values if v is not None]
+        return sum(values) / len(values) if values else None
+    
+    return [
+        StepStats(
+            name=name,
+            runs=len(rows),
+            duration_stats=_percentile_stats([r.duration_ms for r in rows if r.duration_ms is not None]),
+            ttft_stats=_percentile_stats([r.ttft_ms for r in rows if r.ttft_ms is not None]),
+            avg_input_tokens=mean([r.input_tokens for r in rows]),
+            avg_output_tokens=mean([r.output_tokens for r in rows]),
+            critical_path_share=sum(1 for r in rows if r.on_critical_path) / len(rows),
+        )
+        for name, rows in by_name.items()
+    ]
+
+
+@router.get("/{run_id}/steps", response_model=List[RunStep])
+def get_run_steps(run_id: int, db: Session = Depends(get_db)):
+    """Get the per-step records of a multi-step run, in execution order."""
+    run = db.query(RunModel).filter(RunModel.id == run_id).first()
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return db.query(RunStepModel).filter(RunStepModel.run_id == run_id).order_by(
+        RunStepModel.start_offset_ms, RunStepModel.id
+    ).all()
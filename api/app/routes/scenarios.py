@@ -1,26 +1,76 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
-from app.models.models import Scenario as ScenarioModel
-from app.schemas.schemas import Scenario, ScenarioCreate, ScenarioUpdate
+from app.core.serialization import rows_response, schema_columns
+from app.models.models import Automation as AutomationModel, Scenario as ScenarioModel
+from app.schemas.schemas import SamplingPolicy, Scenario, ScenarioCreate, ScenarioUpdate
+from app.services.pipeline import step_automation_ids, validate_pipeline
 
 router = APIRouter()
 
 
+def _validate_steps(steps: Optional[List[dict]], tenant_id: Optional[int], db: Session):
+    """Reject pipelines that are not a valid DAG or use unknown or other tenants' automations."""
+    if not steps:
+        return
+    try:
+        validate_pipeline(steps)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    automation_ids = step_automation_ids(steps)
+    if automation_ids:
+        found = dict(
+            db.query(AutomationModel.id, AutomationModel.tenant_id).filter(AutomationModel.id.in_(automation_ids))
+        )
+        missing = automation_ids - set(found)
+        if missing:
+            raise HTTPException(
+                status_code=422, detail=f"Automation not found: {', '.join(map(str, sorted(missing)))}"
+            )
+        foreign = {automation_id for automation_id, owner in found.items() if owner != tenant_id}
+        if foreign:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Automation belongs to another tenant: {', '.join(map(str, sorted(foreign)))}"
+            )
+
+
+def _automation_tenant(automation_id: int, db: Session) -> Optional[int]:
+    """The tenant owning an automation, which also owns its scenarios."""
+    automation = db.query(AutomationModel).filter(AutomationModel.id == automation_id).first()
+    if automation is None:
+        raise HTTPException(status_code=422, detail=f"Automation not found: {automation_id}")
+    return automation.tenant_id
+
+
+def _validate_run_settings(run_settings: Optional[dict]):
+    """Reject an invalid sampling policy in run_settings."""
+    if run_settings and run_settings.get("sampling") is not None:
+        try:
+            SamplingPolicy(**run_settings["sampling"])
+        except (ValidationError, TypeError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid sampling policy: {e}")
+
+
 @router.get("/", response_model=List[Scenario])
 def list_scenarios(
     skip: int = 0,
     limit: int = 100,
     automation_id: Optional[int] = None,
+    tenant_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """List all scenarios, optionally filtered by automation_id."""
-    query = db.query(ScenarioModel)
+    """List all scenarios, optionally filtered by automation_id or tenant_id."""
+    query = db.query(*schema_columns(ScenarioModel, Scenario))
     if automation_id:
         query = query.filter(ScenarioModel.automation_id == automation_id)
-    scenarios = query.offset(skip).limit(limit).all()
-    return scenarios
+    if tenant_id:
+        query = query.filter(ScenarioModel.tenant_id == tenant_id)
+    rows = query.offset(skip).limit(limit).all()
+    return rows_response(rows, Scenario)
 
 
 @router.get("/{scenario_id}", response_model=Scenario)
@@ -35,7 +85,11 @@ def get_scenario(scenario_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=Scenario)
 def create_scenario(scenario: ScenarioCreate, db: Session = Depends(get_db)):
     """Create a new scenario."""
-    db_scenario = ScenarioModel(**scenario.model_dump())
+    scenario_data = scenario.model_dump()
+    tenant_id = _automation_tenant(scenario_data["automation_id"], db)
+    _validate_steps(scenario_data["steps"], tenant_id, db)
+    _validate_run_settings(scenario_data["run_settings"])
+    db_scenario = ScenarioModel(**scenario_data, tenant_id=tenant_id)
     db.add(db_scenario)
     db.commit()
     db.refresh(db_scenario)
@@ -52,6 +106,15 @@ def update_scenario(
         raise HTTPException(status_code=404, detail="Scenario not found")
     
     update_data = scenario.model_dump(exclude_unset=True)
+    if update_data.get("automation_id") is not None:
+        update_data["tenant_id"] = _automation_tenant(update_data["automation_id"], db)
+    # Stored steps are re-checked too when a new automation moves the scenario to another tenant
+    _validate_steps(
+        update_data["steps"] if "steps" in update_data else db_scenario.steps,
+        update_data.get("tenant_id", db_scenario.tenant_id),
+        db
+    )
+    _validate_run_settings(update_data.get("run_settings"))
     for key, value in update_data.items():
         setattr(db_scenario, key, value)
     
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from app.core.database import get_db
+from app.core.serialization import rows_response, schema_columns
+from app.models.models import Tenant as TenantModel
+from app.schemas.schemas import Tenant, TenantCreate, TenantQueueStats, TenantUpdate
+from app.services.scheduler import scheduler
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[Tenant])
+def list_tenants(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """List all tenants."""
+    rows = db.query(*schema_columns(TenantModel, Tenant)).offset(skip).limit(limit).all()
+    return rows_response(rows, Tenant)
+
+
+@router.get("/queues", response_model=List[TenantQueueStats])
+def get_queue_stats():
+    """
+    Per-tenant scheduler state: queued and running runs, effective limits and
+    the queue wait of recently started runs.
+    """
+    return [TenantQueueStats(**state) for state in scheduler.stats()]
+
+
+@router.get("/{tenant_id}", response_model=Tenant)
+def get_tenant(tenant_id: int, db: Session = Depends(get_db)):
+    """Get a specific tenant."""
+    tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
+    if tenant is None:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    return tenant
+
+
+@router.post("/", response_model=Tenant)
+def create_tenant(tenant: TenantCreate, db: Session = Depends(get_db)):
+    """Create a new tenant."""
+    if db.query(TenantModel.id).filter(TenantModel.name == tenant.name).first() is not None:
+        raise HTTPException(status_code=409, detail="Tenant name already exists")
+    db_tenant = TenantModel(**tenant.model_dump())
+    db.add(db_tenant)
+    db.commit()
+    db.refresh(db_tenant)
+    return db_tenant
+
+
+@router.put("/{tenant_id}", response_model=Tenant)
+def update_tenant(tenant_id: int, tenant: TenantUpdate, db: Session = Depends(get_db)):
+    """Update a tenant; new quotas apply to runs queued from then on."""
+    db_tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
+    if db_tenant is None:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    
+    update_data = tenant.model_dump(exclude_unset=True)
+    if "name" in update_data and db.query(TenantModel.id).filter(
+        TenantModel.name == update_data["name"], TenantModel.id != tenant_id
+    ).first() is not None:
+        raise HTTPException(status_code=409, detail="Tenant name already exists")
+    for key, value in update_data.items():
+        setattr(db_tenant, key, value)
+    
+    db.commit()
+    db.refresh(db_tenant)
+    return db_tenant
+
+
+@router.delete("/{tenant_id}")
+def delete_tenant(tenant_id: int, db: Session = Depends(get_db)):
+    """Delete a tenant that no longer owns any automations."""
+    db_tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
+    if db_tenant is None:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    if db_tenant.automations:
+        raise HTTPException(status_code=409, detail="Tenant still owns automations")
+    
+    db.delete(db_tenant)
+    db.commit()
+    return {"message": "Tenant deleted successfully"}
@@ -1,10 +1,65 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 
+# Shared Schemas
+class PercentileStats(BaseModel):
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
+
+# Tenant Schemas
+class TenantBase(BaseModel):
+    name: str
+    weight: float = Field(1.0, gt=0)  # Fair-queueing share relative to other tenants
+    max_concurrent_runs: Optional[int] = Field(None, ge=1)  # None: up to the global limit
+    runs_per_minute: Optional[int] = Field(None, ge=1)  # None: unlimited
+
+
+class TenantCreate(TenantBase):
+    pass
+
+
+class TenantUpdate(BaseModel):
+    name: Optional[str] = None
+    weight: Optional[float] = Field(None, gt=0)
+    max_concurrent_runs: Optional[int] = Field(None, ge=1)
+    runs_per_minute: Optional[int] = Field(None, ge=1)
+    
+    @model_validator(mode="after")
+    def check_required(self):
+        # Quotas may be cleared with null; name and weight always need a value
+        for name in ("name", "weight"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"{name} cannot be null")
+        return self
+
+
+class Tenant(TenantBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class TenantQueueStats(BaseModel):
+    tenant_id: Optional[int] = None  # None: automations without a tenant
+    queued: int
+    running: int
+    started: int
+    weight: float
+    max_concurrent_runs: int
+    runs_per_minute: Optional[int] = None
+    wait_ms: PercentileStats  # Queue wait of recently started runs
+
+
 # Automation Schemas
 class AutomationBase(BaseModel):
+    tenant_id: Optional[int] = None
     name: str
     tinyfish_automation_id: str
     description: Optional[str] = None
@@ -16,6 +71,7 @@ class AutomationCreate(AutomationBase):
 
 
 class AutomationUpdate(BaseModel):
+    tenant_id: Optional[int] = None
     name: Optional[str] = None
     tinyfish_automation_id: Optional[str] = None
     description: Optional[str] = None
@@ -32,12 +88,38 @@ class Automation(AutomationBase):
 
 
 # Scenario Schemas
+class SamplingPolicy(BaseModel):
+    """``run_settings.sampling``: run each trigger as a batch of samples."""
+    warmup: int = Field(0, ge=0)  # Calls discarded before measuring
+    min_samples: int = Field(5, ge=1)
+    max_samples: int = Field(30, ge=1)
+    # Stop early once the 95% CI of the mean is this narrow
+    target_ci_width_pct: Optional[float] = Field(None, gt=0)
+    target_ci_width_ms: Optional[float] = Field(None, gt=0)
+    outliers: Optional[Literal["mad"]] = None
+    mad_threshold: float = Field(3.5, gt=0)
+    
+    @model_validator(mode="after")
+    def check_sample_bounds(self):
+        if self.max_samples < self.min_samples:
+            raise ValueError("max_samples must be at least min_samples")
+        return self
+
+
+class ScenarioStep(BaseModel):
+    name: str
+    automation_id: Optional[int] = None  # Defaults to the scenario's automation
+    inputs_template: Optional[Dict[str, Any]] = {}
+    depends_on: List[str] = []
+
+
 class ScenarioBase(BaseModel):
     name: str
     automation_id: int
     description: Optional[str] = None
     inputs_template: Optional[Dict[str, Any]] = {}
     run_settings: Optional[Dict[str, Any]] = {}
+    steps: Optional[List[ScenarioStep]] = None  # Multi-step pipeline (DAG)
 
 
 class ScenarioCreate(ScenarioBase):
@@ -50,10 +132,12 @@ class ScenarioUpdate(BaseModel):
     description: Optional[str] = None
     inputs_template: Optional[Dict[str, Any]] = None
     run_settings: Optional[Dict[str, Any]] = None
+    steps: Optional[List[ScenarioStep]] = None
 
 
 class Scenario(ScenarioBase):
     id: int
+    tenant_id: Optional[int] = None  # The automation's tenant
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -85,6 +169,10 @@ class Run(RunBase):
     total_duration_ms: Optional[float] = None
     ttft_ms: Optional[float] = None
     inter_token_stats: Optional[Dict[str, Any]] = None
+    timing_breakdown: Optional[Dict[str, float]] = None
+    samples: Optional[Dict[str, Any]] = None
+    sweep_id: Optional[str] = None
+    sweep_params: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     tinyfish_run_id: Optional[str] = None
     response_json: Optional[Dict[str, Any]] = None
@@ -94,23 +182,102 @@ class Run(RunBase):
         from_attributes = True
 
 
-# KPI Schemas
-class PercentileStats(BaseModel):
-    p50: Optional[float] = None
-    p95: Optional[float] = None
-    p99: Optional[float] = None
+class RunStep(BaseModel):
+    id: int
+    run_id: int
+    name: str
+    automation_id: Optional[int] = None
+    depends_on: Optional[List[str]] = None
+    status: str
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    start_offset_ms: Optional[float] = None
+    duration_ms: Optional[float] = None
+    ttft_ms: Optional[float] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    on_critical_path: bool
+    timing_breakdown: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
+    response_json: Optional[Dict[str, Any]] = None
+    
+    class Config:
+        from_attributes = True
 
 
+# KPI Schemas
 class DashboardKPIs(BaseModel):
     total_runs: int
     success_rate: float
     total_time_stats: PercentileStats
     ttft_stats: Optional[PercentileStats] = None  # Streaming-ready
     avg_inter_token_latency: Optional[float] = None  # Streaming-ready
+    timing_breakdown_stats: Dict[str, PercentileStats] = {}  # Per-phase percentiles of recent runs
     recent_runs: List[Run]
 
 
+class StepStats(BaseModel):
+    name: str
+    runs: int
+    duration_stats: PercentileStats
+    ttft_stats: PercentileStats
+    avg_input_tokens: Optional[float] = None
+    avg_output_tokens: Optional[float] = None
+    critical_path_share: float  # Fraction of runs where the step was on the critical path
+
+
+class TtftFit(BaseModel):
+    intercept_ms: float
+    prefill_ms_per_token: float
+    r_squared: float
+    prompt_tokens: List[float]
+    fitted_ms: List[float]
+
+
+class TotalLatencyFit(BaseModel):
+    intercept_ms: float
+    prefill_ms_per_token: Optional[float] = None
+    decode_ms_per_token: Optional[float] = None
+    r_squared: float
+    prompt_tokens: Optional[List[float]] = None
+    fitted_ms_by_prompt: Optional[List[float]] = None
+    output_tokens: Optional[List[float]] = None
+    fitted_ms_by_output: Optional[List[float]] = None
+
+
+class ScalingFit(BaseModel):
+    automation_id: int
+    automation_name: str
+    runs: int
+    ttft: Optional[TtftFit] = None  # Absent unless prompt length varied
+    total: Optional[TotalLatencyFit] = None  # Absent unless prompt or output length varied
+
+
 # Trigger Run Schema
 class TriggerRunRequest(BaseModel):
     scenario_id: int
     inputs_override: Optional[Dict[str, Any]] = None
+
+
+class SweepGrid(BaseModel):
+    prompt_tokens: List[int] = Field([], max_length=100)
+    max_tokens: List[int] = Field([], max_length=100)
+    temperature: List[float] = Field([], max_length=100)
+    
+    @model_validator(mode="after")
+    def check_sizes(self):
+        if any(size < 1 for size in self.prompt_tokens + self.max_tokens):
+            raise ValueError("prompt_tokens and max_tokens must be positive")
+        return self
+
+
+class SweepRequest(BaseModel):
+    scenario_id: int
+    grid: SweepGrid
+    repeats: int = Field(1, ge=1, le=1000)  # Runs per grid point
+    inputs_override: Optional[Dict[str, Any]] = None
+
+
+class SweepResponse(BaseModel):
+    sweep_id: str
+    run_ids: List[int]
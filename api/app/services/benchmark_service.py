@@ -1,40 +1,133 @@
-import httpx
 import time
 import random
 import asyncio
+import statistics
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
 from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models.models import Run, Scenario, Automation
+from app.core.tracing import extract_trace_context, tracer
+from app.core.metrics import (
+    EXECUTOR_QUEUE_LENGTH,
+    RUNS_IN_FLIGHT,
+    RUNS_TOTAL,
+    TINYFISH_CALL_DURATION,
+    TINYFISH_ERRORS,
+    TINYFISH_TTFT,
+)
+from app.models.models import Run, RunStep, Scenario, Automation
+from app.schemas.schemas import SamplingPolicy
+from app.services.pipeline import (
+    critical_path,
+    estimate_tokens,
+    render_inputs,
+    step_automation_ids,
+    validate_pipeline,
+)
+from app.services.sampling import ci_converged, kept_values, mad_outliers, mean_ci95
+from app.services.timing import PhaseTimer, elapsed_ms
+
+
+def _client_module() -> Any:
+    """
+    httpx for live calls (None in mock mode). It is imported on first use to
+    keep it out of API startup, so callers load it before any timed region:
+    otherwise the first live run would count the import as call time.
+    """
+    if settings.TINYFISH_MOCK_MODE:
+        return None
+    import httpx
+    return httpx
 
 
 async def call_tinyfish_automation(
     automation_id: str,
     inputs: Dict[str, Any],
-    timeout: int = 300
+    timeout: int = 300,
+    timer: Optional[PhaseTimer] = None
 ) -> Dict[str, Any]:
     """
     Call TinyFish automation endpoint.
     
     In mock mode, simulates a TinyFish automation run.
     In real mode, makes actual API call to TinyFish.
+    Call duration and errors are recorded in the Prometheus metrics, and
+    per-phase timings in ``timer`` when one is given.
     """
+    timer = timer or PhaseTimer()
+    mode = "mock" if settings.TINYFISH_MOCK_MODE else "live"
+    client_module = _client_module()
+    with tracer.start_as_current_span(
+        "tinyfish.call",
+        attributes={"tinyfish.automation_id": automation_id, "tinyfish.mode": mode}
+    ):
+        start = time.perf_counter()
+        timer.mark("call.started")
+        try:
+            result = await _call_tinyfish(automation_id, inputs, timeout, timer, client_module)
+        except Exception as e:
+            TINYFISH_CALL_DURATION.labels(mode, "error").observe(time.perf_counter() - start)
+            TINYFISH_ERRORS.labels(mode, type(e).__name__).inc()
+            raise
+        finally:
+            timer.mark("call.complete")
+    
+    TINYFISH_CALL_DURATION.labels(mode, "success").observe(time.perf_counter() - start)
+    ttft_ms = _extract_ttft_ms(result)
+    if ttft_ms is not None:
+        TINYFISH_TTFT.labels(mode).observe(ttft_ms / 1000)
+    return result
+
+
+def _extract_ttft_ms(result: Dict[str, Any]) -> Optional[float]:
+    """Return the time to first token reported in a TinyFish response, if any."""
+    metadata = result.get("metadata") or {}
+    ttft_ms = metadata.get("ttft_ms")
+    return float(ttft_ms) if ttft_ms is not None else None
+
+
+async def _call_tinyfish(
+    automation_id: str,
+    inputs: Dict[str, Any],
+    timeout: int,
+    timer: PhaseTimer,
+    httpx: Any = None
+) -> Dict[str, Any]:
+    """Make the call; ``httpx`` is the module, imported by the caller for live calls."""
     if settings.TINYFISH_MOCK_MODE:
         # Mock mode for local development
         print(f"[MOCK MODE] Simulating TinyFish automation run for automation_id: {automation_id}")
-        await asyncio.sleep(random.uniform(0.5, 2.0))  # Simulate processing time
+        base_time = random.uniform(
+            settings.TINYFISH_MOCK_LATENCY_MIN_S, settings.TINYFISH_MOCK_LATENCY_MAX_S
+        )
+        # Scale with prompt length (prefill) and generated tokens (decode) like a real model
+        max_tokens = inputs.get("max_tokens")
+        tokens_generated = (
+            random.randint(max(1, int(max_tokens) * 3 // 4), int(max_tokens))
+            if max_tokens else random.randint(50, 200)
+        )
+        prefill_ms = estimate_tokens(inputs.get("prompt") or "") * settings.TINYFISH_MOCK_PREFILL_MS_PER_TOKEN
+        decode_ms = tokens_generated * settings.TINYFISH_MOCK_DECODE_MS_PER_TOKEN
+        processing_time = base_time + (prefill_ms + decode_ms) / 1000
+        
+        # There is no network in mock mode, so all of the time is server time
+        timer.mark("send_request_body.complete")
+        await asyncio.sleep(processing_time)  # Simulate processing time
+        timer.mark("receive_response_headers.complete")
         
         return {
             "run_id": f"mock_run_{int(time.time())}",
             "status": "completed",
             "output": {
                 "response": f"This is a mock response for automation {automation_id}",
-                "tokens_generated": random.randint(50, 200),
+                "tokens_generated": tokens_generated,
                 "model": "mock-model-v1"
             },
             "metadata": {
-                "execution_time_ms": random.uniform(500, 2000)
+                "execution_time_ms": processing_time * 1000,
+                "ttft_ms": base_time * 1000 * random.uniform(0.1, 0.3) + prefill_ms
             }
         }
     else:
@@ -54,71 +147,429 @@ async def call_tinyfish_automation(
         }
         
         async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(url, json=payload, headers=headers)
+            response = await client.post(
+                url, json=payload, headers=headers, extensions={"trace": timer.trace}
+            )
             response.raise_for_status()
             return response.json()
 
 
+def _timing_breakdown(run: Run, timer: PhaseTimer) -> Dict[str, float]:
+    """
+    Combine the call phases with the executor-side phases of a run.
+
+    ``queue_ms`` is the wait between triggering and execution start and
+    ``overhead_ms`` is time spent around the TinyFish call itself (event loop
+    startup, client setup), so our own overhead can be told apart from
+    provider latency.
+    """
+    breakdown = timer.breakdown()
+    queue_ms = elapsed_ms(run.created_at, run.started_at)
+    if queue_ms is not None:
+        breakdown["queue_ms"] = max(queue_ms, 0.0)
+    if "call_ms" in breakdown and run.total_duration_ms is not None:
+        breakdown["overhead_ms"] = max(run.total_duration_ms - breakdown["call_ms"], 0.0)
+    return breakdown
+
+
+def _run_single_call(
+    run: Run,
+    scenario: Scenario,
+    automation: Automation,
+    inputs_override: Optional[Dict[str, Any]]
+):
+    """Execute a single-call scenario and record the result on the run."""
+    # Prepare inputs
+    inputs = {**automation.default_inputs, **scenario.inputs_template}
+    if inputs_override:
+        inputs.update(inputs_override)
+    
+    # Execute the automation
+    timer = PhaseTimer()
+    start_time = time.time()
+    
+    try:
+        result = asyncio.run(call_tinyfish_automation(
+            automation_id=automation.tinyfish_automation_id,
+            inputs=inputs,
+            timeout=settings.DEFAULT_TIMEOUT_SECONDS,
+            timer=timer
+        ))
+        
+        end_time = time.time()
+        total_duration_ms = (end_time - start_time) * 1000
+        
+        # Update run with results
+        run.status = "completed"
+        run.finished_at = datetime.utcnow()
+        run.total_duration_ms = total_duration_ms
+        run.ttft_ms = _extract_ttft_ms(result)
+        run.tinyfish_run_id = result.get("run_id")
+        run.response_json = result
+        
+    except Exception as e:
+        # Handle errors
+        end_time = time.time()
+        total_duration_ms = (end_time - start_time) * 1000
+        
+        run.status = "failed"
+        run.finished_at = datetime.utcnow()
+        run.total_duration_ms = total_duration_ms
+        run.error = str(e)
+    
+    run.timing_breakdown = _timing_breakdown(run, timer)
+
+
+async def _collect_samples(
+    automation: Automation,
+    inputs: Dict[str, Any],
+    policy: SamplingPolicy
+) -> Dict[str, Any]:
+    """
+    Make the warm-up calls, then sample sequentially in one event loop.
+    
+    Without a CI target exactly ``min_samples`` calls are measured; with one,
+    sampling continues until the 95% CI of the mean (outliers excluded when
+    tagging is on) is narrow enough or ``max_samples`` calls were made.
+    Failed calls count towards the limit but yield no sample.
+    """
+    async def call(timer: PhaseTimer) -> Dict[str, Any]:
+        return await call_tinyfish_automation(
+            automation_id=automation.tinyfish_automation_id,
+            inputs=inputs,
+            timeout=settings.DEFAULT_TIMEOUT_SECONDS,
+            timer=timer
+        )
+    
+    warmup_ms = []
+    for _ in range(policy.warmup):
+        timer = PhaseTimer()
+        try:
+            await call(timer)
+        except Exception:
+            pass
+        warmup_ms.append(timer.breakdown().get("call_ms"))
+    
+    has_target = policy.target_ci_width_pct is not None or policy.target_ci_width_ms is not None
+    limit = policy.max_samples if has_target else policy.min_samples
+    durations, ttfts, breakdowns = [], [], []
+    failures, converged = 0, False
+    last_result, last_error = None, None
+    for _ in range(limit):
+        timer = PhaseTimer()
+        try:
+            last_result = await call(timer)
+        except Exception as e:
+            failures += 1
+            last_error = str(e)
+            continue
+        breakdown = timer.breakdown()
+        breakdowns.append(breakdown)
+        durations.append(breakdown["call_ms"])
+        ttfts.append(_extract_ttft_ms(last_result))
+        
+        if has_target and len(durations) >= policy.min_samples:
+            outliers = mad_outliers(durations, policy.mad_threshold) if policy.outliers else []
+            kept = [d for i, d in enumerate(durations) if i not in outliers]
+            if ci_converged(kept, policy.target_ci_width_pct, policy.target_ci_width_ms):
+                converged = True
+                break
+    
+    return {
+        "warmup_ms": warmup_ms,
+        "durations": durations,
+        "ttfts": ttfts,
+        "breakdowns": breakdowns,
+        "failures": failures,
+        "converged": converged,
+        "last_result": last_result,
+        "last_error": last_error,
+    }
+
+
+def _run_sampled(
+    run: Run,
+    scenario: Scenario,
+    automation: Automation,
+    inputs_override: Optional[Dict[str, Any]],
+    policy: SamplingPolicy
+):
+    """
+    Execute a single-call scenario as a grouped batch of samples, stored as
+    compact arrays on the run; the run's own latency fields hold the medians.
+    """
+    inputs = {**automation.default_inputs, **scenario.inputs_template}
+    if inputs_override:
+        inputs.update(inputs_override)
+    
+    start_time = time.time()
+    batch = asyncio.run(_collect_samples(automation, inputs, policy))
+    batch_ms = (time.time() - start_time) * 1000
+    run.finished_at = datetime.utcnow()
+    
+    def compact(values):
+        return [round(v, 3) if v is not None else None for v in values]
+    
+    durations = batch["durations"]
+    outliers = mad_outliers(durations, policy.mad_threshold) if policy.outliers else []
+    samples = {
+        "duration_ms": compact(durations),
+        "ttft_ms": compact(batch["ttfts"]),
+        "warmup_ms": compact(batch["warmup_ms"]),
+        "outliers": outliers,
+        "failures": batch["failures"],
+        "converged": batch["converged"],
+        "batch_ms": round(batch_ms, 3),
+    }
+    kept = kept_values(samples)
+    interval = mean_ci95(kept)
+    samples["ci95_ms"] = compact(interval) if interval else None
+    run.samples = samples
+    
+    breakdown = {}
+    kept_breakdowns = [b for i, b in enumerate(batch["breakdowns"]) if i not in set(outliers)]
+    for phase in {phase for b in kept_breakdowns for phase in b}:
+        breakdown[phase] = statistics.median([b[phase] for b in kept_breakdowns if phase in b])
+    queue_ms = elapsed_ms(run.created_at, run.started_at)
+    if queue_ms is not None:
+        breakdown["queue_ms"] = max(queue_ms, 0.0)
+    run.timing_breakdown = breakdown
+    
+    if not durations:
+        run.status = "failed"
+        run.total_duration_ms = batch_ms
+        run.error = batch["last_error"]
+        return
+    
+    ttfts = kept_values(samples, "ttft_ms")
+    run.status = "completed"
+    run.total_duration_ms = statistics.median(kept)
+    run.ttft_ms = statistics.median(ttfts) if ttfts else None
+    run.tinyfish_run_id = batch["last_result"].get("run_id")
+    run.response_json = batch["last_result"]
+
+
+def _token_counts(inputs: Dict[str, Any], result: Dict[str, Any]):
+    """Input/output token counts reported by the provider, estimating input if absent."""
+    usage = result.get("usage") or {}
+    output = result.get("output") if isinstance(result.get("output"), dict) else {}
+    input_tokens = usage.get("prompt_tokens") or estimate_tokens(inputs)
+    output_tokens = usage.get("completion_tokens") or output.get("tokens_generated")
+    return input_tokens, output_tokens
+
+
+async def _execute_steps(
+    steps: List[Dict[str, Any]],
+    automations: Dict[int, Automation],
+    default_automation: Automation,
+    base_inputs: Dict[str, Any],
+    timer: PhaseTimer
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run pipeline steps, each as soon as all of its dependencies completed, so
+    independent steps run concurrently. Returns a record per step name.
+    """
+    outputs: Dict[str, Any] = {}
+    records: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+    timer.mark("call.started")
+    origin = time.perf_counter()
+    
+    async def run_step(step: Dict[str, Any]):
+        depends_on = step.get("depends_on") or []
+        await asyncio.gather(*(tasks[name] for name in depends_on))
+        
+        automation_id = step.get("automation_id")
+        automation = automations.get(automation_id) if automation_id else default_automation
+        record = records[step["name"]] = {
+            "name": step["name"],
+            "automation_id": automation.id if automation else None,
+            "depends_on": depends_on,
+            "status": "pending",
+        }
+        upstream_failed = [name for name in depends_on if records[name]["status"] != "completed"]
+        if upstream_failed:
+            record["status"] = "skipped"
+            record["error"] = f"Upstream step(s) did not complete: {', '.join(upstream_failed)}"
+            return
+        if automation is None:
+            # Deleted since the scenario was saved; never substitute another automation
+            record["status"] = "failed"
+            record["error"] = f"Automation not found: {automation_id}"
+            return
+        
+        inputs = {
+            **automation.default_inputs,
+            **base_inputs,
+            **render_inputs(step.get("inputs_template") or {}, outputs),
+        }
+        step_timer = PhaseTimer()
+        record["started_at"] = datetime.utcnow()
+        start = time.perf_counter()
+        with tracer.start_as_current_span("pipeline.step", attributes={"step.name": step["name"]}):
+            try:
+                result = await call_tinyfish_automation(
+                    automation_id=automation.tinyfish_automation_id,
+                    inputs=inputs,
+                    timeout=settings.DEFAULT_TIMEOUT_SECONDS,
+                    timer=step_timer
+                )
+                outputs[step["name"]] = result
+                input_tokens, output_tokens = _token_counts(inputs, result)
+                record.update(
+                    status="completed",
+                    ttft_ms=_extract_ttft_ms(result),
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    response_json=result,
+                )
+            except Exception as e:
+                record.update(status="failed", error=str(e), input_tokens=estimate_tokens(inputs))
+        end = time.perf_counter()
+        record.update(
+            finished_at=datetime.utcnow(),
+            start_offset_ms=(start - origin) * 1000,
+            duration_ms=(end - start) * 1000,
+            timing_breakdown=step_timer.breakdown(),
+        )
+    
+    for name in validate_pipeline(steps):
+        step = next(step for step in steps if step["name"] == name)
+        tasks[name] = asyncio.create_task(run_step(step))
+    await asyncio.gather(*tasks.values())
+    timer.mark("call.complete")
+    return records
+
+
+def _run_pipeline(
+    db,
+    run: Run,
+    scenario: Scenario,
+    automation: Automation,
+    inputs_override: Optional[Dict[str, Any]]
+):
+    """Execute a multi-step scenario and record the run and one RunStep per step."""
+    steps = scenario.steps
+    automations = {
+        a.id: a for a in db.query(Automation).filter(Automation.id.in_(step_automation_ids(steps)))
+    }
+    base_inputs = {**scenario.inputs_template, **(inputs_override or {})}
+    
+    timer = PhaseTimer()
+    start_time = time.time()
+    records = asyncio.run(_execute_steps(steps, automations, automation, base_inputs, timer))
+    run.total_duration_ms = (time.time() - start_time) * 1000
+    run.finished_at = datetime.utcnow()
+    
+    path = critical_path({
+        name: {
+            "depends_on": record["depends_on"],
+            "end": (
+                record["start_offset_ms"] + record["duration_ms"]
+                if record.get("duration_ms") is not None else None
+            ),
+        }
+        for name, record in records.items()
+    })
+    for name, record in records.items():
+        db.add(RunStep(run_id=run.id, on_critical_path=name in path, **record))
+    
+    failed = [record for record in records.values() if record["status"] == "failed"]
+    if failed:
+        run.status = "failed"
+        run.error = f"Step '{failed[0]['name']}' failed: {failed[0]['error']}"
+    else:
+        run.status = "completed"
+        # End-to-end TTFT: first token of the step that finished the pipeline
+        last = records[path[-1]]
+        if last.get("ttft_ms") is not None:
+            run.ttft_ms = last["start_offset_ms"] + last["ttft_ms"]
+    
+    upstream = {name for record in records.values() for name in record["depends_on"]}
+    run.response_json = {
+        "critical_path": path,
+        "outputs": {
+            name: record.get("response_json")
+            for name, record in records.items() if name not in upstream
+        },
+    }
+    run.timing_breakdown = _timing_breakdown(run, timer)
+
+
 def execute_benchmark_run(
     run_id: int,
     scenario_id: int,
-    inputs_override: Optional[Dict[str, Any]] = None
+    inputs_override: Optional[Dict[str, Any]] = None,
+    trace_context: Optional[Dict[str, str]] = None
 ):
     """
     Execute a benchmark run synchronously.
     This is called as a background task from the API.
+    
+    ``trace_context`` carries the triggering request's trace across the queue
+    boundary (it is JSON-serializable, so it survives a Celery hop too).
     """
+    with tracer.start_as_current_span(
+        "execute_benchmark_run",
+        context=extract_trace_context(trace_context),
+        kind=SpanKind.CONSUMER,
+        attributes={"run.id": run_id, "scenario.id": scenario_id}
+    ):
+        _execute_benchmark_run(run_id, scenario_id, inputs_override)
+
+
+def _execute_benchmark_run(
+    run_id: int,
+    scenario_id: int,
+    inputs_override: Optional[Dict[str, Any]]
+):
+    EXECUTOR_QUEUE_LENGTH.dec()
     db = SessionLocal()
+    run = None
+    automation = None
+    in_flight = False
     try:
         # Get run, scenario, and automation
         run = db.query(Run).filter(Run.id == run_id).first()
-        scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
-        automation = db.query(Automation).filter(Automation.id == scenario.automation_id).first()
-        
-        if not run or not scenario or not automation:
+        if run is None:
+            # Deleted while queued: nothing to execute or count
             return
+        scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
+        if scenario is not None:
+            automation = db.query(Automation).filter(Automation.id == scenario.automation_id).first()
         
-        # Update run status to running
-        run.status = "running"
-        run.started_at = datetime.utcnow()
+        # Claim the run: only a pending run moves to running, so a run queued
+        # twice (a retried or double-fired dispatch) calls TinyFish once
+        claimed = db.query(Run).filter(Run.id == run_id, Run.status == "pending").update(
+            {"status": "running", "started_at": datetime.utcnow()}, synchronize_session=False
+        )
         db.commit()
+        if not claimed:
+            run = None
+            return
+        db.refresh(run)
+        RUNS_IN_FLIGHT.inc()
+        in_flight = True
+        # Load the HTTP client before the run's timers start
+        _client_module()
         
-        # Prepare inputs
-        inputs = {**automation.default_inputs, **scenario.inputs_template}
-        if inputs_override:
-            inputs.update(inputs_override)
-        
-        # Execute the automation
-        start_time = time.time()
+        if scenario is None or automation is None:
+            raise ValueError("Scenario or automation no longer exists")
         
-        try:
-            result = asyncio.run(call_tinyfish_automation(
-                automation_id=automation.tinyfish_automation_id,
-                inputs=inputs,
-                timeout=settings.DEFAULT_TIMEOUT_SECONDS
-            ))
-            
-            end_time = time.time()
-            total_duration_ms = (end_time - start_time) * 1000
-            
-            # Update run with results
-            run.status = "completed"
-            run.finished_at = datetime.utcnow()
-            run.total_duration_ms = total_duration_ms
-            run.tinyfish_run_id = result.get("run_id")
-            run.response_json = result
-            
-        except Exception as e:
-            # Handle errors
-            end_time = time.time()
-            total_duration_ms = (end_time - start_time) * 1000
-            
-            run.status = "failed"
-            run.finished_at = datetime.utcnow()
-            run.total_duration_ms = total_duration_ms
-            run.error = str(e)
+        sampling = (scenario.run_settings or {}).get("sampling")
+        if scenario.steps:
+            _run_pipeline(db, run, scenario, automation, inputs_override)
+        elif sampling:
+            _run_sampled(run, scenario, automation, inputs_override, SamplingPolicy(**sampling))
+        else:
+            _run_single_call(run, scenario, automation, inputs_override)
         
+        trace.get_current_span().set_attributes({
+            "run.status": run.status,
+            "run.queue_ms": (run.timing_breakdown or {}).get("queue_ms", 0.0),
+        })
         db.commit()
+        RUNS_TOTAL.labels(run.status, automation.tinyfish_automation_id).inc()
         
     except Exception as e:
         print(f"Error executing benchmark run {run_id}: {e}")
@@ -126,6 +577,9 @@ def execute_benchmark_run(
             run.status = "failed"
             run.error = str(e)
             db.commit()
+            RUNS_TOTAL.labels("failed", automation.tinyfish_automation_id if automation else "unknown").inc()
     
     finally:
+        if in_flight:
+            RUNS_IN_FLIGHT.dec()
         db.close()
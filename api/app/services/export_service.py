@@ -0,0 +1,260 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+from sqlalchemy import select
+from app.core.database import SessionLocal
+from app.models.models import Run, Scenario
+from app.schemas.schemas import InterTokenStats
+from app.services.timing import TIMING_PHASES
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+RESPONSE_JSON_MODES = ("omit", "raw", "flatten")
+
+# Flattened response_json keys first seen after the CSV/Parquet header was fixed,
+# as a JSON object, so no data is dropped
+OVERFLOW_COLUMN = "response_json_extra"
+
+# Rows fetched per server-side cursor round trip; also the Parquet row group size
+EXPORT_BATCH_SIZE = 1000
+
+SCALAR_COLUMNS = [
+    "id", "scenario_id", "status", "created_at", "started_at", "finished_at",
+    "total_duration_ms", "ttft_ms", "error", "tinyfish_run_id",
+]
+INTER_TOKEN_COLUMNS = [f"inter_token_{key}" for key in InterTokenStats.model_fields]
+TIMING_COLUMNS = [f"timing_{phase}" for phase in TIMING_PHASES]
+
+
+def apply_run_filters(
+    query,
+    scenario_id: Optional[int] = None,
+    status: Optional[str] = None,
+    tenant_id: Optional[int] = None
+):
+    """Apply the run list filters to a query or select()."""
+    if scenario_id:
+        query = query.filter(Run.scenario_id == scenario_id)
+    if status:
+        query = query.filter(Run.status == status)
+    if tenant_id:
+        query = query.filter(Run.scenario_id.in_(select(Scenario.id).where(Scenario.tenant_id == tenant_id)))
+    return query
+
+
+def export_columns(response_json: str) -> List[str]:
+    """Columns present in every export for the given response_json mode."""
+    columns = SCALAR_COLUMNS + INTER_TOKEN_COLUMNS + TIMING_COLUMNS
+    if response_json == "raw":
+        return columns + ["response_json"]
+    if response_json == "flatten":
+        return columns + [OVERFLOW_COLUMN]
+    return columns
+
+
+def _fieldnames(columns: List[str], batch: List[Dict[str, Any]]) -> List[str]:
+    """Fixed columns followed by any extra (flattened) keys seen in the batch."""
+    return list(dict.fromkeys(columns + [key for record in batch for key in record]))
+
+
+def _fit_header(record: Dict[str, Any], fieldnames: Set[str]) -> Dict[str, Any]:
+    """Move keys missing from a fixed header into the overflow column."""
+    extra = {key: value for key, value in record.items() if key not in fieldnames}
+    if not extra:
+        return record
+    record = {key: value for key, value in record.items() if key in fieldnames}
+    record[OVERFLOW_COLUMN] = json.dumps(extra, default=_json_default)
+    return record
+
+
+def _flatten(value: Any, prefix: str, out: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten nested dicts into dotted keys; lists are kept as JSON strings."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f"{prefix}.{key}", out)
+    elif isinstance(value, list):
+        out[prefix] = json.dumps(value)
+    else:
+        out[prefix] = value
+    return out
+
+
+def _export_row(row, response_json: str) -> Dict[str, Any]:
+    """Convert a result row into a flat export record."""
+    record = {column: row[column] for column in SCALAR_COLUMNS}
+    inter_token_stats = row["inter_token_stats"] or {}
+    for key in InterTokenStats.model_fields:
+        record[f"inter_token_{key}"] = inter_token_stats.get(key)
+    timing_breakdown = row["timing_breakdown"] or {}
+    for phase in TIMING_PHASES:
+        record[f"timing_{phase}"] = timing_breakdown.get(phase)
+
+    if response_json == "raw":
+        record["response_json"] = row["response_json"]
+    elif response_json == "flatten" and row["response_json"]:
+        _flatten(row["response_json"], "response_json", record)
+    return record
+
+
+def iter_run_batches(
+    scenario_id: Optional[int] = None,
+    status: Optional[str] = None,
+    response_json: str = "omit",
+    batch_size: int = EXPORT_BATCH_SIZE,
+    tenant_id: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield export records in batches from a server-side cursor.
+
+    Only one batch is held in memory at a time, regardless of how many runs
+    match. The generator owns its session because it outlives the request
+    handler that created the response.
+    """
+    columns = [getattr(Run, column) for column in SCALAR_COLUMNS]
+    columns += [Run.inter_token_stats, Run.timing_breakdown]
+    if response_json != "omit":
+        columns.append(Run.response_json)
+    stmt = apply_run_filters(select(*columns), scenario_id, status, tenant_id).order_by(Run.id)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt, execution_options={"yield_per": batch_size})
+        for partition in result.mappings().partitions():
+            yield [_export_row(row, response_json) for row in partition]
+    finally:
+        db.close()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_jsonl(batches: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(json.dumps(record, default=_json_default) + "\n" for record in batch).encode()
+
+
+def stream_csv(batches: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    """
+    Stream CSV. The header is fixed by the first batch; with flattened
+    response_json, keys that only appear in later rows go to the
+    response_json_extra column.
+    """
+    writer = None
+    header = set()
+    buffer = io.StringIO()
+    for batch in batches:
+        if writer is None:
+            fieldnames = _fieldnames(columns, batch)
+            header = set(fieldnames)
+            writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+            writer.writeheader()
+        for record in batch:
+            writer.writerow({key: _csv_value(value) for key, value in _fit_header(record, header).items()})
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if writer is None:
+        csv.writer(buffer).writerow(columns)
+        yield buffer.getvalue().encode()
+
+
+class _ParquetSink:
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet footers record absolute offsets, so report bytes written so far
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(batches: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    """
+    Stream Parquet, one row group per batch. Flattened response_json values
+    are stored as strings since their types are not known up front, and keys
+    first seen after the first batch go to the response_json_extra column.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    known_types = {
+        "id": pa.int64(), "scenario_id": pa.int64(), "status": pa.string(),
+        "created_at": timestamp, "started_at": timestamp, "finished_at": timestamp,
+        "total_duration_ms": pa.float64(), "ttft_ms": pa.float64(),
+        "error": pa.string(), "tinyfish_run_id": pa.string(),
+        **{column: pa.float64() for column in INTER_TOKEN_COLUMNS + TIMING_COLUMNS},
+    }
+
+    def build_schema(fieldnames):
+        return pa.schema([(name, known_types.get(name, pa.string())) for name in fieldnames])
+
+    sink = _ParquetSink()
+    writer = None
+    schema = None
+    header = set()
+    for batch in batches:
+        if writer is None:
+            schema = build_schema(_fieldnames(columns, batch))
+            header = set(schema.names)
+            writer = pq.ParquetWriter(sink, schema)
+        rows = [
+            {
+                name: (
+                    value if name in known_types or value is None or isinstance(value, str)
+                    else json.dumps(value, default=_json_default)
+                )
+                for name, value in _fit_header(record, header).items()
+            }
+            for record in batch
+        ]
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        yield sink.drain()
+
+    if writer is None:
+        writer = pq.ParquetWriter(sink, build_schema(columns))
+    writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "jsonl": stream_jsonl,
+    "parquet": stream_parquet,
+}
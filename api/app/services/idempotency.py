@@ -0,0 +1,76 @@
+"""
+Idempotency keys for run triggers.
+
+A client retrying ``POST /runs/trigger`` or ``/runs/sweep`` with the same
+``Idempotency-Key`` header gets the runs the first request created instead of
+new runs and new TinyFish calls. Keys live in ``idempotency_keys`` under a
+unique index, so a lookup is one index probe however many keys are stored, and
+two concurrent first requests race on the insert: the loser's runs roll back
+with its key. A key is honoured for IDEMPOTENCY_KEY_TTL_HOURS; expired keys are
+removed a bounded batch at a time as new keys are written.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import IdempotencyKey
+from app.services.timing import elapsed_ms
+
+# Expired keys deleted per key written, so purging never stalls a trigger
+PURGE_BATCH_SIZE = 100
+
+
+def request_hash(endpoint: str, request: BaseModel) -> str:
+    """SHA-256 of the endpoint and request body, to detect a key reused for another request."""
+    body = json.dumps(request.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}\n{body}".encode()).hexdigest()
+
+
+def find_key(db: Session, key: str) -> Optional[IdempotencyKey]:
+    """The unexpired record of ``key``; an expired one is deleted so the key can be reused."""
+    record = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+    if record is not None and elapsed_ms(record.expires_at, datetime.utcnow()) >= 0:
+        # Bulk delete: the purge or a concurrent request may already have removed the row
+        db.query(IdempotencyKey).filter(IdempotencyKey.id == record.id).delete(synchronize_session=False)
+        db.expunge(record)
+        return None
+    return record
+
+
+def record_key(
+    db: Session,
+    key: str,
+    endpoint: str,
+    hash_: str,
+    run_ids: List[int],
+    sweep_id: Optional[str] = None
+) -> IdempotencyKey:
+    """Add ``key`` for the runs of this request, to be committed together with them."""
+    now = datetime.utcnow()
+    _purge_expired(db, now)
+    record = IdempotencyKey(
+        key=key,
+        endpoint=endpoint,
+        request_hash=hash_,
+        run_ids=run_ids,
+        sweep_id=sweep_id,
+        created_at=now,
+        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    )
+    db.add(record)
+    return record
+
+
+def _purge_expired(db: Session, now: datetime) -> None:
+    expired = (
+        db.query(IdempotencyKey.id)
+        .filter(IdempotencyKey.expires_at <= now)
+        .limit(PURGE_BATCH_SIZE)
+        .scalar_subquery()
+    )
+    db.query(IdempotencyKey).filter(IdempotencyKey.id.in_(expired)).delete(synchronize_session=False)
@@ -0,0 +1,138 @@
+"""
+Multi-step scenario pipelines.
+
+A scenario's ``steps`` is a list of step definitions forming a DAG:
+
+    {"name": "plan", "inputs_template": {...}, "depends_on": []}
+    {"name": "answer", "automation_id": 2, "depends_on": ["plan"],
+     "inputs_template": {"prompt": "Given {{steps.plan.output.response}}, answer ..."}}
+
+String inputs may reference the output of a step they depend on with
+``{{steps.<name>.<path>}}``. Steps without an ``automation_id`` use the
+scenario's automation.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Set
+
+STEP_REFERENCE = re.compile(r"\{\{\s*steps\.([A-Za-z0-9_\-]+)((?:\.[A-Za-z0-9_\-]+)*)\s*\}\}")
+
+
+def _references(value: Any) -> List[str]:
+    """Names of the steps referenced anywhere in a template value."""
+    if isinstance(value, str):
+        return [match.group(1) for match in STEP_REFERENCE.finditer(value)]
+    if isinstance(value, dict):
+        return [name for item in value.values() for name in _references(item)]
+    if isinstance(value, list):
+        return [name for item in value for name in _references(item)]
+    return []
+
+
+def validate_pipeline(steps: List[Dict[str, Any]]) -> List[str]:
+    """
+    Check a pipeline definition and return the step names in topological order.
+
+    Raises ValueError for duplicate names, unknown dependencies, references to
+    steps that are not dependencies, and cycles.
+    """
+    names = [step["name"] for step in steps]
+    if len(set(names)) != len(names):
+        raise ValueError("Step names must be unique")
+
+    for step in steps:
+        depends_on = step.get("depends_on") or []
+        for dependency in depends_on:
+            if dependency not in names:
+                raise ValueError(f"Step '{step['name']}' depends on unknown step '{dependency}'")
+        for reference in _references(step.get("inputs_template") or {}):
+            if reference not in depends_on:
+                raise ValueError(
+                    f"Step '{step['name']}' references '{reference}' without depending on it"
+                )
+
+    # Kahn's algorithm
+    remaining = {step["name"]: set(step.get("depends_on") or []) for step in steps}
+    order = []
+    while remaining:
+        ready = sorted(name for name, dependencies in remaining.items() if not dependencies)
+        if not ready:
+            raise ValueError(f"Steps form a cycle: {', '.join(sorted(remaining))}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for dependencies in remaining.values():
+            dependencies.difference_update(ready)
+    return order
+
+
+def step_automation_ids(steps: Optional[List[Dict[str, Any]]]) -> Set[int]:
+    """Automations named by a pipeline's steps (steps without one use the scenario's)."""
+    return {step["automation_id"] for step in steps or [] if step.get("automation_id")}
+
+
+def _lookup(value: Any, path: List[str]) -> Any:
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+
+def render_inputs(template: Any, outputs: Dict[str, Any]) -> Any:
+    """
+    Substitute ``{{steps.<name>.<path>}}`` references with earlier step outputs.
+
+    A string that is exactly one reference takes the referenced value as-is;
+    references embedded in longer strings are formatted as text (JSON for
+    non-string values).
+    """
+    if isinstance(template, dict):
+        return {key: render_inputs(value, outputs) for key, value in template.items()}
+    if isinstance(template, list):
+        return [render_inputs(value, outputs) for value in template]
+    if not isinstance(template, str):
+        return template
+
+    def resolve(match) -> Any:
+        path = [key for key in match.group(2).split(".") if key]
+        return _lookup(outputs.get(match.group(1)), path)
+
+    whole = STEP_REFERENCE.fullmatch(template.strip())
+    if whole:
+        return resolve(whole)
+
+    def substitute(match) -> str:
+        value = resolve(match)
+        return value if isinstance(value, str) else json.dumps(value)
+
+    return STEP_REFERENCE.sub(substitute, template)
+
+
+def critical_path(steps: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Return the chain of steps that determined the end-to-end latency.
+
+    ``steps`` maps names to {"depends_on", "start", "end"} (any clock). Starting
+    from the step that finished last, walk back through the dependency that
+    finished last, i.e. the one that gated each step's start.
+    """
+    finished = {name: step for name, step in steps.items() if step.get("end") is not None}
+    if not finished:
+        return []
+    name: Optional[str] = max(finished, key=lambda n: finished[n]["end"])
+    path = []
+    while name is not None:
+        path.append(name)
+        dependencies = [d for d in steps[name].get("depends_on") or [] if d in finished]
+        name = max(dependencies, key=lambda d: finished[d]["end"]) if dependencies else None
+    return list(reversed(path))
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count (~4 characters per token) when the provider reports none."""
+    text = value if isinstance(value, str) else json.dumps(value)
+    return max(1, len(text) // 4)
@@ -0,0 +1,76 @@
+"""
+Statistics for sampled runs: confidence intervals for the stopping rule and
+MAD-based outlier tagging.
+"""
+from typing import List, Optional, Tuple
+
+# Two-sided 95% Student t critical values for 1-30 degrees of freedom
+_T95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+def t95(df: int) -> float:
+    """Two-sided 95% t critical value, using a series approximation beyond the table."""
+    if df <= len(_T95):
+        return _T95[df - 1]
+    return 1.96 + 2.37 / df
+
+
+def mean_ci95(values: List[float]) -> Optional[Tuple[float, float]]:
+    """95% confidence interval for the mean, or None with fewer than two values."""
+    if len(values) < 2:
+        return None
+    import numpy as np
+
+    data = np.asarray(values, dtype=float)
+    half_width = t95(len(data) - 1) * data.std(ddof=1) / np.sqrt(len(data))
+    mean = float(data.mean())
+    return mean - float(half_width), mean + float(half_width)
+
+
+def mad_outliers(values: List[float], threshold: float = 3.5) -> List[int]:
+    """
+    Indices of outliers by modified z-score (Iglewicz and Hoaglin):
+    0.6745 * |x - median| / MAD above ``threshold``.
+    """
+    if len(values) < 3:
+        return []
+    import numpy as np
+
+    data = np.asarray(values, dtype=float)
+    median = np.median(data)
+    mad = np.median(np.abs(data - median))
+    if mad == 0:
+        return []
+    scores = 0.6745 * np.abs(data - median) / mad
+    return [int(i) for i in np.flatnonzero(scores > threshold)]
+
+
+def ci_converged(
+    values: List[float],
+    target_width_pct: Optional[float] = None,
+    target_width_ms: Optional[float] = None
+) -> bool:
+    """Whether the 95% CI of the mean is at most the target width (relative or absolute)."""
+    interval = mean_ci95(values)
+    if interval is None:
+        return False
+    width = interval[1] - interval[0]
+    mean = (interval[0] + interval[1]) / 2
+    if target_width_ms is not None and width > target_width_ms:
+        return False
+    if target_width_pct is not None and (mean <= 0 or width / mean * 100 > target_width_pct):
+        return False
+    return target_width_ms is not None or target_width_pct is not None
+
+
+def kept_values(samples: dict, key: str = "duration_ms") -> List[float]:
+    """Values of a stored sample array, excluding tagged outliers and gaps."""
+    outliers = set(samples.get("outliers") or [])
+    return [
+        value for index, value in enumerate(samples.get(key) or [])
+        if index not in outliers and value is not None
+    ]
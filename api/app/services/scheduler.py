@@ -0,0 +1,229 @@
+"""
+Weighted fair-queueing run scheduler.
+
+Runs are queued per tenant and started by a fixed pool of MAX_CONCURRENT_RUNS
+worker threads, so the global limit holds across triggers and sweeps. Among
+tenants that are under their concurrency quota and have rate budget left,
+the next run is the one with the smallest virtual finish tag:
+
+    start  = max(virtual_time, tenant's last finish tag)
+    finish = start + 1 / weight
+
+so each backlogged tenant gets run starts in proportion to its weight, and a
+tenant queueing a 1000-run sweep only delays others by its fair share. Rate
+quotas are token buckets refilled at ``runs_per_minute`` that hold at most
+SCHEDULER_RATE_BURST run starts, so a tenant cannot release a minute's quota
+at once; runs over the rate wait in the queue rather than failing.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    SCHEDULER_QUEUE_DEPTH,
+    SCHEDULER_RUNNING,
+    SCHEDULER_WAIT,
+)
+
+# Queue waits kept per tenant for the scheduler stats endpoint
+RECENT_WAITS = 1000
+
+
+@dataclass
+class TenantQuota:
+    weight: float = 1.0
+    max_concurrent_runs: Optional[int] = None  # None: up to the global limit
+    runs_per_minute: Optional[int] = None  # None: unlimited
+
+    @classmethod
+    def of(cls, tenant: Any) -> "TenantQuota":
+        """Quota of a Tenant row, or the defaults for runs without a tenant."""
+        if tenant is None:
+            return cls()
+        return cls(tenant.weight, tenant.max_concurrent_runs, tenant.runs_per_minute)
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    kwargs: Dict[str, Any]
+    finish_tag: float
+    start_tag: float
+    enqueued_at: float
+
+
+@dataclass
+class _TenantState:
+    quota: TenantQuota
+    queue: Deque[_Job] = field(default_factory=deque)
+    running: int = 0
+    started: int = 0
+    last_finish_tag: float = 0.0
+    tokens: float = 0.0
+    refilled_at: float = 0.0
+    waits_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_WAITS))
+
+
+def _label(tenant_id: Optional[int]) -> str:
+    return "default" if tenant_id is None else str(tenant_id)
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    import numpy as np
+
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+class RunScheduler:
+    """Per-tenant queues served by a global worker pool in weighted fair order."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._max_workers = max_workers
+        self._cond = threading.Condition()
+        self._tenants: Dict[Optional[int], _TenantState] = {}
+        self._virtual_time = 0.0
+        self._workers: List[threading.Thread] = []
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers or settings.MAX_CONCURRENT_RUNS
+
+    def submit(
+        self,
+        tenant_id: Optional[int],
+        quota: TenantQuota,
+        fn: Callable[..., Any],
+        **kwargs
+    ) -> None:
+        """Queue ``fn(**kwargs)`` for ``tenant_id``, updating the tenant's quota."""
+        with self._cond:
+            self._start_workers()
+            state = self._tenants.get(tenant_id)
+            now = time.monotonic()
+            if state is None:
+                state = _TenantState(quota, tokens=self._burst(quota), refilled_at=now)
+                self._tenants[tenant_id] = state
+            state.quota = quota
+
+            start_tag = max(self._virtual_time, state.last_finish_tag)
+            state.last_finish_tag = start_tag + 1.0 / quota.weight
+            state.queue.append(_Job(fn, kwargs, state.last_finish_tag, start_tag, now))
+            SCHEDULER_QUEUE_DEPTH.labels(_label(tenant_id)).inc()
+            self._cond.notify()
+
+    def _start_workers(self) -> None:
+        # Started on first use so importing the app stays cheap
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work, name=f"run-scheduler-{len(self._workers)}", daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _limit(self, quota: TenantQuota) -> int:
+        return min(quota.max_concurrent_runs or self.max_workers, self.max_workers)
+
+    def _burst(self, quota: TenantQuota) -> float:
+        """Run starts a rate-limited tenant may make back to back."""
+        if not quota.runs_per_minute:
+            return 0.0
+        return float(max(1, min(settings.SCHEDULER_RATE_BURST, quota.runs_per_minute)))
+
+    def _next(self, now: float):
+        """
+        Pop the eligible job with the smallest finish tag as (tenant_id, job,
+        None), or return (None, None, retry_in) with the seconds until a
+        rate-limited tenant may start again (None if none is rate-limited).
+        """
+        best_id, best_state, retry_in = None, None, None
+        for tenant_id, state in self._tenants.items():
+            if not state.queue or state.running >= self._limit(state.quota):
+                continue
+            rate = state.quota.runs_per_minute
+            if rate:
+                refilled = state.tokens + (now - state.refilled_at) * rate / 60
+                state.tokens = min(self._burst(state.quota), refilled)
+                state.refilled_at = now
+                if state.tokens < 1:
+                    wait = (1 - state.tokens) * 60 / rate
+                    retry_in = wait if retry_in is None else min(retry_in, wait)
+                    continue
+            if best_state is None or state.queue[0].finish_tag < best_state.queue[0].finish_tag:
+                best_id, best_state = tenant_id, state
+        if best_state is None:
+            return None, None, retry_in
+
+        job = best_state.queue.popleft()
+        if best_state.quota.runs_per_minute:
+            best_state.tokens -= 1
+        best_state.running += 1
+        best_state.started += 1
+        self._virtual_time = max(self._virtual_time, job.start_tag)
+        return best_id, job, None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    tenant_id, job, retry_in = self._next(time.monotonic())
+                    if job is not None:
+                        break
+                    self._cond.wait(timeout=retry_in)
+                state = self._tenants[tenant_id]
+                wait_s = time.monotonic() - job.enqueued_at
+                state.waits_ms.append(wait_s * 1000)
+
+            label = _label(tenant_id)
+            SCHEDULER_QUEUE_DEPTH.labels(label).dec()
+            SCHEDULER_WAIT.labels(label).observe(wait_s)
+            SCHEDULER_RUNNING.labels(label).inc()
+            try:
+                job.fn(**job.kwargs)
+            except Exception as e:
+                # The executor records its own failures; never let one kill the worker
+                print(f"Scheduled run failed: {e}")
+            finally:
+                SCHEDULER_RUNNING.labels(label).dec()
+                with self._cond:
+                    state.running -= 1
+                    self._cond.notify_all()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Queue depth, running runs, limits and recent wait percentiles per tenant."""
+        with self._cond:
+            stats = [
+                {
+                    "tenant_id": tenant_id,
+                    "queued": len(state.queue),
+                    "running": state.running,
+                    "started": state.started,
+                    "weight": state.quota.weight,
+                    "max_concurrent_runs": self._limit(state.quota),
+                    "runs_per_minute": state.quota.runs_per_minute,
+                    "wait_ms": list(state.waits_ms),
+                }
+                for tenant_id, state in self._tenants.items()
+            ]
+        for entry in stats:
+            entry["wait_ms"] = _percentiles(entry["wait_ms"])
+        return stats
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queue is empty and no run is executing."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(state.queue or state.running for state in self._tenants.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+            return True
+
+
+scheduler = RunScheduler()
@@ -0,0 +1,137 @@
+"""
+Parameter sweeps for latency scaling curves.
+
+A sweep expands a grid such as
+
+    {"prompt_tokens": [128, 512, 2048], "max_tokens": [64, 256], "temperature": [0.0]}
+
+into one run per combination (times ``repeats``). Fitting the results
+separates prefill from decode cost per automation:
+
+    ttft_ms  = a + prefill_ms_per_token * prompt_tokens
+    total_ms = b + prefill_ms_per_token' * prompt_tokens + decode_ms_per_token * output_tokens
+"""
+import itertools
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SWEEP_PARAMETERS = ("prompt_tokens", "max_tokens", "temperature")
+
+# Repeated to pad prompts to a target length (~4 characters per token, as estimate_tokens)
+_FILLER = "The quick brown fox jumps over the lazy dog. "
+
+
+def grid_size(grid: Dict[str, List[Any]], repeats: int = 1) -> int:
+    """Runs expand_grid() would produce, without building them."""
+    sizes = [len(grid[name]) for name in SWEEP_PARAMETERS if grid.get(name)]
+    return math.prod(sizes) * repeats if sizes else 0
+
+
+def expand_grid(grid: Dict[str, List[Any]], repeats: int = 1) -> List[Dict[str, Any]]:
+    """Every combination of the grid's values, each repeated ``repeats`` times."""
+    names = [name for name in SWEEP_PARAMETERS if grid.get(name)]
+    if not names:
+        return []
+    points = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    return [point for point in points for _ in range(repeats)]
+
+
+def sweep_inputs(base_inputs: Dict[str, Any], point: Dict[str, Any]) -> Dict[str, Any]:
+    """Inputs for one grid point; the prompt is padded or cut to ``prompt_tokens``."""
+    inputs = dict(base_inputs)
+    if "prompt_tokens" in point:
+        length = point["prompt_tokens"] * 4
+        prompt = str(inputs.get("prompt") or "")
+        if len(prompt) < length:
+            padding = length - len(prompt) - 1
+            prompt = f"{prompt} {_FILLER * (padding // len(_FILLER) + 1)}"
+        inputs["prompt"] = prompt[:length]
+    for name in ("max_tokens", "temperature"):
+        if name in point:
+            inputs[name] = point[name]
+    return inputs
+
+
+def output_tokens(response_json: Optional[Dict[str, Any]], max_tokens: Optional[int]) -> Optional[int]:
+    """Tokens generated according to the provider, falling back to ``max_tokens``."""
+    response_json = response_json or {}
+    usage = response_json.get("usage") or {}
+    output = response_json.get("output") if isinstance(response_json.get("output"), dict) else {}
+    return usage.get("completion_tokens") or output.get("tokens_generated") or max_tokens
+
+
+def _fit(columns: List["np.ndarray"], target: "np.ndarray") -> Tuple["np.ndarray", float]:
+    """Least-squares coefficients (intercept first) and R² of ``target`` on ``columns``."""
+    import numpy as np
+
+    design = np.column_stack([np.ones_like(target), *columns])
+    coefficients, _, _, _ = np.linalg.lstsq(design, target, rcond=None)
+    residual = target - design @ coefficients
+    total = np.sum((target - target.mean()) ** 2)
+    r_squared = float(1 - np.sum(residual ** 2) / total) if total > 0 else 1.0
+    return coefficients, r_squared
+
+
+def fit_scaling(
+    prompt_tokens: "np.ndarray",
+    generated_tokens: "np.ndarray",
+    ttft_ms: "np.ndarray",
+    total_ms: "np.ndarray"
+) -> Dict[str, Any]:
+    """
+    Fit prefill and decode slopes for one automation's completed sweep runs.
+
+    TTFT is fitted on prompt length alone; total latency on prompt length and
+    output tokens. A size that did not vary in the sweep gets no slope, and the
+    curves are the fitted values at each distinct size that was measured.
+    """
+    import numpy as np
+
+    result: Dict[str, Any] = {"runs": int(len(total_ms))}
+    vary_prompt = len(np.unique(prompt_tokens)) > 1
+    vary_output = len(np.unique(generated_tokens)) > 1
+
+    has_ttft = ~np.isnan(ttft_ms)
+    if vary_prompt and len(np.unique(prompt_tokens[has_ttft])) > 1:
+        (intercept, slope), r_squared = _fit([prompt_tokens[has_ttft]], ttft_ms[has_ttft])
+        sizes = np.unique(prompt_tokens[has_ttft])
+        result["ttft"] = {
+            "intercept_ms": float(intercept),
+            "prefill_ms_per_token": float(slope),
+            "r_squared": r_squared,
+            "prompt_tokens": sizes.tolist(),
+            "fitted_ms": (intercept + slope * sizes).tolist(),
+        }
+
+    columns, names = [], []
+    if vary_prompt:
+        columns.append(prompt_tokens)
+        names.append("prefill_ms_per_token")
+    if vary_output:
+        columns.append(generated_tokens)
+        names.append("decode_ms_per_token")
+    if columns:
+        coefficients, r_squared = _fit(columns, total_ms)
+        slopes = dict(zip(names, coefficients[1:].tolist()))
+        total = {"intercept_ms": float(coefficients[0]), **slopes, "r_squared": r_squared}
+        # Each curve holds the other size at its median
+        prompt_mid, output_mid = np.median(prompt_tokens), np.median(generated_tokens)
+        if vary_prompt:
+            sizes = np.unique(prompt_tokens)
+            total["prompt_tokens"] = sizes.tolist()
+            total["fitted_ms_by_prompt"] = (
+                coefficients[0] + slopes["prefill_ms_per_token"] * sizes
+                + slopes.get("decode_ms_per_token", 0.0) * output_mid
+            ).tolist()
+        if vary_output:
+            sizes = np.unique(generated_tokens)
+            total["output_tokens"] = sizes.tolist()
+            total["fitted_ms_by_output"] = (
+                coefficients[0] + slopes["decode_ms_per_token"] * sizes
+                + slopes.get("prefill_ms_per_token", 0.0) * prompt_mid
+            ).tolist()
+        result["total"] = total
+    return result
@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Phase name -> (start event, end event). Events come from httpx/httpcore trace
+# hooks with the protocol prefix stripped, plus our own "call.*" marks.
+# httpcore resolves the host inside connect_tcp, so DNS and the TCP handshake
+# are one phase; timing the lookup separately would mean resolving twice.
+PHASES = {
+    "client_setup_ms": ("call.started", "connect_tcp.started"),
+    "dns_connect_ms": ("connect_tcp.started", "connect_tcp.complete"),
+    "tls_ms": ("start_tls.started", "start_tls.complete"),
+    "send_ms": ("send_request_headers.started", "send_request_body.complete"),
+    "ttfb_ms": ("send_request_body.complete", "receive_response_headers.complete"),
+    "time_to_headers_ms": ("call.started", "receive_response_headers.complete"),
+    "download_ms": ("receive_response_body.started", "receive_response_body.complete"),
+    "call_ms": ("call.started", "call.complete"),
+}
+
+# Every key that can appear in a run's timing_breakdown, in pipeline order
+TIMING_PHASES = ("queue_ms", *PHASES, "overhead_ms")
+
+
+class PhaseTimer:
+    """
+    Collect per-phase timings for a single TinyFish call.
+
+    Pass ``trace`` as the httpx ``trace`` request extension; httpcore then
+    reports connection setup, request send and response receive events.
+    """
+
+    def __init__(self):
+        self._marks: Dict[str, float] = {}
+
+    def mark(self, event: str) -> None:
+        """Record the first occurrence of an event."""
+        self._marks.setdefault(event, time.perf_counter())
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpx trace hook, e.g. ``http11.send_request_headers.started``."""
+        prefix, _, event = event_name.partition(".")
+        if prefix in ("connection", "http11", "http2"):
+            self.mark(event)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Return the duration in milliseconds of every phase that was observed."""
+        result = {}
+        for phase, (start_event, end_event) in PHASES.items():
+            start = self._marks.get(start_event)
+            end = self._marks.get(end_event)
+            if start is not None and end is not None:
+                result[phase] = (end - start) * 1000
+        return result
+
+
+def elapsed_ms(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    """Milliseconds between two timestamps that may be naive UTC or timezone-aware."""
+    if start is None or end is None:
+        return None
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    return (end - start).total_seconds() * 1000
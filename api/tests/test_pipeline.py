@@ -0,0 +1,73 @@
+import pytest
+
+from app.services.pipeline import critical_path, render_inputs, step_automation_ids, validate_pipeline
+
+
+def test_validate_pipeline_returns_topological_order():
+    steps = [
+        {"name": "answer", "depends_on": ["plan", "search"],
+         "inputs_template": {"prompt": "{{steps.plan.output.response}} {{steps.search.output}}"}},
+        {"name": "search", "depends_on": ["plan"]},
+        {"name": "plan"},
+    ]
+    assert validate_pipeline(steps) == ["plan", "search", "answer"]
+
+
+def test_validate_pipeline_rejects_duplicate_names():
+    with pytest.raises(ValueError, match="unique"):
+        validate_pipeline([{"name": "a"}, {"name": "a"}])
+
+
+def test_validate_pipeline_rejects_unknown_dependency():
+    with pytest.raises(ValueError, match="unknown step 'missing'"):
+        validate_pipeline([{"name": "a", "depends_on": ["missing"]}])
+
+
+def test_validate_pipeline_rejects_reference_without_dependency():
+    steps = [{"name": "a"}, {"name": "b", "inputs_template": {"prompt": "{{steps.a.output}}"}}]
+    with pytest.raises(ValueError, match="without depending on it"):
+        validate_pipeline(steps)
+
+
+def test_validate_pipeline_rejects_cycles():
+    steps = [
+        {"name": "a", "depends_on": ["c"]},
+        {"name": "b", "depends_on": ["a"]},
+        {"name": "c", "depends_on": ["b"]},
+        {"name": "d"},
+    ]
+    with pytest.raises(ValueError, match="cycle: a, b, c"):
+        validate_pipeline(steps)
+
+
+def test_critical_path_follows_the_gating_dependency():
+    steps = {
+        "plan": {"depends_on": [], "end": 100},
+        "fast": {"depends_on": ["plan"], "end": 150},
+        "slow": {"depends_on": ["plan"], "end": 400},
+        "answer": {"depends_on": ["fast", "slow"], "end": 500},
+    }
+    assert critical_path(steps) == ["plan", "slow", "answer"]
+
+
+def test_critical_path_skips_unfinished_steps():
+    steps = {
+        "plan": {"depends_on": [], "end": 100},
+        "failed": {"depends_on": ["plan"], "end": None},
+        "other": {"depends_on": ["plan"], "end": 300},
+    }
+    assert critical_path(steps) == ["plan", "other"]
+    assert critical_path({"a": {"depends_on": [], "end": None}}) == []
+
+
+def test_render_inputs_substitutes_step_outputs():
+    outputs = {"plan": {"output": {"response": "go", "tokens": 3}}}
+    assert render_inputs({"prompt": "Plan: {{steps.plan.output.response}}"}, outputs) == {"prompt": "Plan: go"}
+    # A whole-string reference keeps the value's type
+    assert render_inputs("{{ steps.plan.output.tokens }}", outputs) == 3
+
+
+def test_step_automation_ids():
+    steps = [{"name": "a", "automation_id": 2}, {"name": "b"}, {"name": "c", "automation_id": 5}]
+    assert step_automation_ids(steps) == {2, 5}
+    assert step_automation_ids(None) == set()
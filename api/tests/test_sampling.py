@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.sampling import ci_converged, kept_values, mad_outliers, mean_ci95, t95
+
+
+def test_t95_uses_table_then_approximation():
+    assert t95(1) == 12.706
+    assert t95(30) == 2.042
+    assert t95(1000) == pytest.approx(1.96, abs=0.01)
+
+
+def test_mean_ci95_needs_two_values():
+    assert mean_ci95([]) is None
+    assert mean_ci95([10.0]) is None
+    low, high = mean_ci95([9.0, 10.0, 11.0])
+    assert low < 10.0 < high
+    assert high - 10.0 == pytest.approx(10.0 - low)
+
+
+def test_mad_outliers_tags_extreme_values():
+    values = [100.0, 102.0, 98.0, 101.0, 99.0, 100.0, 1000.0]
+    assert mad_outliers(values) == [6]
+    assert mad_outliers(values, threshold=1e6) == []
+
+
+def test_mad_outliers_edge_cases():
+    assert mad_outliers([1.0, 1000.0]) == []  # too few values
+    assert mad_outliers([5.0, 5.0, 5.0, 500.0]) == []  # MAD of zero
+
+
+def test_ci_converged_relative_and_absolute_targets():
+    tight = [100.0, 100.5, 99.5, 100.2, 99.8]
+    wide = [50.0, 150.0, 80.0, 120.0]
+    assert ci_converged(tight, target_width_pct=5)
+    assert not ci_converged(wide, target_width_pct=5)
+    assert ci_converged(tight, target_width_ms=5)
+    assert not ci_converged(tight, target_width_pct=5, target_width_ms=0.01)
+
+
+def test_ci_converged_without_a_target_or_enough_samples():
+    assert not ci_converged([100.0, 100.0, 100.0])
+    assert not ci_converged([100.0], target_width_pct=5)
+
+
+def test_kept_values_drops_outliers_and_gaps():
+    samples = {"duration_ms": [1.0, 2.0, 300.0, 4.0], "ttft_ms": [0.5, None, 0.7, 0.8], "outliers": [2]}
+    assert kept_values(samples) == [1.0, 2.0, 4.0]
+    assert kept_values(samples, "ttft_ms") == [0.5, 0.8]
+    assert kept_values({}) == []
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from app.services.scheduler import RunScheduler, TenantQuota
+
+
+def _blocked(scheduler: RunScheduler, gate: threading.Event) -> None:
+    """Occupy every worker until ``gate`` is set, so later submissions queue up."""
+    for _ in range(scheduler.max_workers):
+        scheduler.submit(-1, TenantQuota(), gate.wait)
+    while sum(state.running for state in scheduler._tenants.values()) < scheduler.max_workers:
+        time.sleep(0.001)
+
+
+def test_backlogged_tenants_start_in_proportion_to_weight():
+    scheduler = RunScheduler(max_workers=1)
+    gate = threading.Event()
+    _blocked(scheduler, gate)
+
+    order = []
+
+    def job(tenant):
+        order.append(tenant)
+
+    for _ in range(6):
+        scheduler.submit(1, TenantQuota(weight=2), job, tenant="heavy")
+    for _ in range(3):
+        scheduler.submit(2, TenantQuota(weight=1), job, tenant="light")
+    gate.set()
+    assert scheduler.join(timeout=5)
+
+    assert len(order) == 9
+    # Every prefix keeps the 2:1 share, within one start
+    for n in range(1, len(order) + 1):
+        assert abs(order[:n].count("heavy") - 2 * n / 3) < 1
+
+
+def test_tenant_concurrency_is_capped_below_the_pool():
+    scheduler = RunScheduler(max_workers=4)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def job():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    for _ in range(8):
+        scheduler.submit(1, TenantQuota(max_concurrent_runs=2), job)
+    assert scheduler.join(timeout=5)
+    assert running["peak"] == 2
+
+
+def test_capped_tenant_leaves_workers_for_others():
+    scheduler = RunScheduler(max_workers=2)
+    gate = threading.Event()
+    for _ in range(3):
+        scheduler.submit(1, TenantQuota(max_concurrent_runs=1), gate.wait)
+    done = threading.Event()
+    scheduler.submit(2, TenantQuota(), done.set)
+
+    # Tenant 1 holds one worker; tenant 2's run starts on the other
+    assert done.wait(timeout=5)
+    gate.set()
+    assert scheduler.join(timeout=5)
@@ -0,0 +1,158 @@
+"""Trigger throughput and executor concurrency scaling benchmarks."""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+from common import mock_latency, quiet, result
+
+
+def bench_trigger_throughput(scenario_ids: List[int], runs: int = 300) -> List[Dict]:
+    """
+    Runs per second through POST /runs/trigger, including execution.
+
+    The mock call takes no time, so this measures the API and executor
+    overhead per run rather than simulated provider latency.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.scheduler import scheduler
+
+    mock_latency(0.0)
+    with TestClient(app) as client, quiet():
+        for i in range(10):  # warm-up
+            client.post("/api/v1/runs/trigger", json={"scenario_id": scenario_ids[i % len(scenario_ids)]})
+        scheduler.join()
+        start = time.perf_counter()
+        for i in range(runs):
+            response = client.post(
+                "/api/v1/runs/trigger", json={"scenario_id": scenario_ids[i % len(scenario_ids)]}
+            )
+            response.raise_for_status()
+        scheduler.join()
+        elapsed = time.perf_counter() - start
+    return [
+        result("trigger_throughput", runs / elapsed, "runs/s", better="higher"),
+        result("trigger_latency", elapsed / runs * 1000, "ms"),
+    ]
+
+
+def _create_pending_runs(scenario_id: int, count: int) -> List[int]:
+    from app.core.database import SessionLocal
+    from app.models.models import Run
+
+    db = SessionLocal()
+    try:
+        runs = [Run(scenario_id=scenario_id, status="pending", created_at=datetime.utcnow()) for _ in range(count)]
+        db.add_all(runs)
+        db.commit()
+        return [run.id for run in runs]
+    finally:
+        db.close()
+
+
+def bench_executor_scaling(
+    scenario_ids: List[int],
+    concurrency_levels=(1, 2, 4, 8, 16),
+    runs_per_worker: int = 8,
+    latency_s: float = 0.05
+) -> List[Dict]:
+    """
+    Executor throughput with a fixed simulated provider latency at increasing
+    concurrency; efficiency is throughput relative to perfect linear scaling.
+    """
+    from app.core.metrics import EXECUTOR_QUEUE_LENGTH
+    from app.services.benchmark_service import execute_benchmark_run
+
+    mock_latency(latency_s)
+    results = []
+    scenario_id = scenario_ids[0]
+    for workers in concurrency_levels:
+        run_ids = _create_pending_runs(scenario_id, workers * runs_per_worker)
+        EXECUTOR_QUEUE_LENGTH.inc(len(run_ids))
+        with quiet(), ThreadPoolExecutor(max_workers=workers) as pool:
+            start = time.perf_counter()
+            list(pool.map(lambda run_id: execute_benchmark_run(run_id, scenario_id), run_ids))
+            elapsed = time.perf_counter() - start
+        throughput = len(run_ids) / elapsed
+        ideal = workers / latency_s
+        results.append(result(f"executor_throughput@{workers}", throughput, "runs/s", better="higher"))
+        results.append(result(f"executor_efficiency@{workers}", throughput / ideal, "ratio", better="higher"))
+    return results
+
+
+def bench_tenant_isolation(
+    scenario_ids: List[int],
+    load_runs: int = 200,
+    probe_runs: int = 20,
+    latency_s: float = 0.02
+) -> List[Dict]:
+    """
+    Queue wait of a light tenant's runs, alone and while another tenant has a
+    ``load_runs`` sweep queued; fair scheduling should keep the two close.
+    """
+    from fastapi.testclient import TestClient
+    from app.core.database import SessionLocal
+    from app.main import app
+    from app.models.models import Automation, Run, Scenario, Tenant
+    from app.services.scheduler import scheduler
+
+    db = SessionLocal()
+    try:
+        tenant_ids = []
+        for name in ("bench-heavy", "bench-light"):
+            tenant = Tenant(name=name, weight=1.0)
+            db.add(tenant)
+            db.flush()
+            source = db.query(Scenario).filter(Scenario.id == scenario_ids[len(tenant_ids)]).first()
+            automation = Automation(
+                tenant_id=tenant.id, name=f"{name}-automation",
+                tinyfish_automation_id=f"{name}_auto", default_inputs={},
+            )
+            db.add(automation)
+            db.flush()
+            scenario = Scenario(
+                tenant_id=tenant.id, automation_id=automation.id, name=f"{name}-scenario",
+                inputs_template=source.inputs_template, run_settings={},
+            )
+            db.add(scenario)
+            db.flush()
+            tenant_ids.append((tenant.id, scenario.id))
+        db.commit()
+    finally:
+        db.close()
+    (_, heavy_scenario), (_, light_scenario) = tenant_ids
+
+    def probe(client) -> float:
+        """p95 queue wait of the light tenant's runs, triggered one at a time."""
+        run_ids = []
+        for _ in range(probe_runs):
+            response = client.post("/api/v1/runs/trigger", json={"scenario_id": light_scenario})
+            response.raise_for_status()
+            run_ids.append(response.json()["id"])
+            time.sleep(latency_s)
+        scheduler.join()
+        db = SessionLocal()
+        try:
+            waits = [
+                (breakdown or {}).get("queue_ms", 0.0)
+                for (breakdown,) in db.query(Run.timing_breakdown).filter(Run.id.in_(run_ids))
+            ]
+        finally:
+            db.close()
+        return statistics.quantiles(waits, n=20)[-1]
+
+    mock_latency(latency_s)
+    with TestClient(app) as client, quiet():
+        idle_ms = probe(client)
+        client.post("/api/v1/runs/sweep", json={
+            "scenario_id": heavy_scenario, "grid": {"max_tokens": [64]}, "repeats": load_runs,
+        }).raise_for_status()
+        loaded_ms = probe(client)
+        scheduler.join()
+    return [
+        result("tenant_wait_p95_idle", idle_ms, "ms"),
+        result("tenant_wait_p95_under_load", loaded_ms, "ms"),
+    ]
@@ -0,0 +1,72 @@
+"""Dashboard KPI, list pagination and export benchmarks at growing history sizes."""
+
+import time
+from typing import Dict, List
+
+from common import insert_synthetic_runs, median_ms, result
+
+
+def _count_runs() -> int:
+    from app.core.database import SessionLocal
+    from app.models.models import Run
+
+    db = SessionLocal()
+    try:
+        return db.query(Run).count()
+    finally:
+        db.close()
+
+
+def bench_history_sizes(
+    scenario_ids: List[int],
+    sizes=(10_000, 100_000, 1_000_000),
+    export_formats=("csv", "jsonl", "parquet"),
+    seed: int = 0
+) -> List[Dict]:
+    """
+    Grow the runs table to each size in turn and time the read paths on it:
+    the dashboard KPIs, the first and a deep page of the run list, and a full
+    export in each format.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    results = []
+    with TestClient(app) as client:
+        for size in sorted(sizes):
+            existing = _count_runs()
+            if size > existing:
+                insert_synthetic_runs(size - existing, scenario_ids, seed=seed + size)
+
+            results.append(result(
+                f"kpis_dashboard@{size}",
+                median_ms(lambda: client.get("/api/v1/runs/kpis/dashboard").raise_for_status()),
+                "ms",
+            ))
+            results.append(result(
+                f"list_runs_first_page@{size}",
+                median_ms(lambda: client.get("/api/v1/runs/?limit=100").raise_for_status()),
+                "ms",
+            ))
+            results.append(result(
+                f"list_runs_deep_page@{size}",
+                median_ms(lambda: client.get(f"/api/v1/runs/?skip={size // 2}&limit=100").raise_for_status()),
+                "ms",
+            ))
+            results.append(result(
+                f"list_runs_filtered_page@{size}",
+                median_ms(lambda: client.get("/api/v1/runs/?status=failed&limit=100").raise_for_status()),
+                "ms",
+            ))
+
+            for export_format in export_formats:
+                start = time.perf_counter()
+                with client.stream("GET", f"/api/v1/runs/export?format={export_format}") as response:
+                    response.raise_for_status()
+                    for _ in response.iter_bytes():
+                        pass
+                elapsed = time.perf_counter() - start
+                results.append(result(
+                    f"export_{export_format}@{size}", _count_runs() / elapsed, "rows/s", better="higher"
+                ))
+    return results
@@ -0,0 +1,91 @@
+"""
+Response serialization benchmarks for the run list and the dashboard.
+
+Compares the validated path FastAPI takes for ORM objects (Pydantic
+validation through the response schema, JSON-mode dump, stdlib json) with the
+row-tuple fast path (schema columns straight to orjson), both on the encoding
+step alone and end to end through the API.
+"""
+
+from typing import Dict, List
+
+from common import insert_synthetic_runs, median_ms, result
+
+
+def _validated_body(objects, schema) -> bytes:
+    """What FastAPI does with a response_model: validate, dump to JSON types, json.dumps."""
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    adapter = TypeAdapter(List[schema])
+    value = adapter.validate_python(objects, from_attributes=True)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def _fast_body(rows, schema) -> bytes:
+    from app.core.serialization import rows_response
+
+    return rows_response(rows, schema).body
+
+
+def _legacy_app():
+    """The run list as it was served before the fast path, for the end-to-end comparison."""
+    from fastapi import Depends, FastAPI
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import desc
+    from sqlalchemy.orm import Session
+    from app.core.database import get_db
+    from app.models.models import Run as RunModel
+    from app.schemas.schemas import Run
+
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/runs", response_model=List[Run])
+    def list_runs(limit: int = 100, db: Session = Depends(get_db)):
+        return db.query(RunModel).order_by(desc(RunModel.created_at)).limit(limit).all()
+
+    return app
+
+
+def bench_serialization(scenario_ids: List[int], history: int = 10_000, page: int = 100) -> List[Dict]:
+    """
+    Serialization throughput (rows/s) of a ``page``-row run list page and the
+    dashboard's recent runs on either path, and end-to-end request latency.
+    """
+    from fastapi.testclient import TestClient
+    from sqlalchemy import desc
+    from app.core.database import SessionLocal
+    from app.core.serialization import schema_columns
+    from app.main import app
+    from app.models.models import Run as RunModel
+    from app.schemas.schemas import Run
+
+    db = SessionLocal()
+    try:
+        if db.query(RunModel).count() < history:
+            insert_synthetic_runs(history, scenario_ids, seed=history)
+        objects = db.query(RunModel).order_by(desc(RunModel.created_at)).limit(page).all()
+        rows = db.query(*schema_columns(RunModel, Run)).order_by(desc(RunModel.created_at)).limit(page).all()
+
+        results = []
+        for name, count in (("list_page", page), ("dashboard_recent", 10)):
+            validated_ms = median_ms(lambda: _validated_body(objects[:count], Run), repeat=20)
+            fast_ms = median_ms(lambda: _fast_body(rows[:count], Run), repeat=20)
+            results += [
+                result(f"serialize_{name}_validated", count / validated_ms * 1000, "rows/s", better="higher"),
+                result(f"serialize_{name}_fast", count / fast_ms * 1000, "rows/s", better="higher"),
+                result(f"serialize_{name}_speedup", validated_ms / fast_ms, "x", better="higher"),
+            ]
+    finally:
+        db.close()
+
+    with TestClient(_legacy_app()) as legacy, TestClient(app) as client:
+        legacy_ms = median_ms(lambda: legacy.get(f"/runs?limit={page}").raise_for_status(), repeat=20)
+        current_ms = median_ms(lambda: client.get(f"/api/v1/runs/?limit={page}").raise_for_status(), repeat=20)
+        dashboard_ms = median_ms(lambda: client.get("/api/v1/runs/kpis/dashboard").raise_for_status())
+    results += [
+        result("list_runs_request_validated", legacy_ms, "ms"),
+        result("list_runs_request_fast", current_ms, "ms"),
+        result("kpis_dashboard_request", dashboard_ms, "ms"),
+    ]
+    return results
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start in fresh interpreters, with an optional time budget.
+
+Each round starts a new Python process that imports ``app.main`` and runs
+the app's lifespan until /ready would report ready, so module import, lazy
+settings/engine creation and the pool warm-up are all included. Exits
+non-zero when the median time to ready exceeds --budget-ms.
+
+    python benchmarks/bench_startup.py --budget-ms 3000
+    python benchmarks/bench_startup.py --profile   # slowest imports (-X importtime)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from common import API_DIR, DEFAULT_DATABASE_URL, result
+
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def wait_ready():
+    from app.core.readiness import is_ready
+    async with app.main.app.router.lifespan_context(app.main.app):
+        while not is_ready():
+            await asyncio.sleep(0.001)
+
+asyncio.run(wait_ready())
+ready = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "ready_ms": (ready - start) * 1000}))
+"""
+
+
+def _environment(database_url: str) -> Dict[str, str]:
+    return {**os.environ, "DATABASE_URL": database_url, "TINYFISH_MOCK_MODE": "true"}
+
+
+def measure_cold_start(database_url: str = DEFAULT_DATABASE_URL, rounds: int = 5) -> Dict[str, float]:
+    """Median import, time-to-ready and whole-process times in milliseconds."""
+    samples: Dict[str, List[float]] = {"import_ms": [], "ready_ms": [], "process_ms": []}
+    for _ in range(rounds):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], cwd=API_DIR, env=_environment(database_url),
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples["process_ms"].append((time.perf_counter() - start) * 1000)
+        for name, value in json.loads(output.strip().splitlines()[-1]).items():
+            samples[name].append(value)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def import_profile(database_url: str = DEFAULT_DATABASE_URL, top: int = 20) -> List[tuple]:
+    """(module, self_us, cumulative_us) of the slowest imports by cumulative time."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=API_DIR,
+        env=_environment(database_url), capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+
+
+def bench_startup(database_url: str = DEFAULT_DATABASE_URL, rounds: int = 5) -> List[Dict]:
+    timings = measure_cold_start(database_url, rounds)
+    return [
+        result("startup_import", timings["import_ms"], "ms"),
+        result("startup_ready", timings["ready_ms"], "ms"),
+        result("startup_process", timings["process_ms"], "ms"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="Database the warm-up connects to")
+    parser.add_argument("--rounds", type=int, default=5, help="Cold starts to take the median of")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median time to ready exceeds this")
+    parser.add_argument("--profile", action="store_true", help="Print the slowest imports instead")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.profile:
+        print(f"{'module':48s} {'self ms':>9s} {'cumulative ms':>14s}")
+        for module, self_us, cumulative_us in import_profile(args.database_url):
+            print(f"{module:48s} {self_us / 1000:9.1f} {cumulative_us / 1000:14.1f}")
+        return
+
+    results = bench_startup(args.database_url, args.rounds)
+    for entry in results:
+        print(f"{entry['name']:32s} {entry['value']:10.2f} {entry['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    ready_ms = results[1]["value"]
+    if args.budget_ms is not None and ready_ms > args.budget_ms:
+        print(f"OVER BUDGET: ready after {ready_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Shared setup for the platform benchmark suite.
+
+Benchmarks run in-process against the API app with TinyFish mock mode on.
+configure() must be called before anything from ``app`` is imported, since
+the settings and the database engine are built from the environment.
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT_DIR, "api")
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+DEFAULT_DATABASE_URL = "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark.db")
+
+for path in (API_DIR, SCRIPTS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def configure(database_url: str = DEFAULT_DATABASE_URL) -> None:
+    """Point the app at the benchmark database and force TinyFish mock mode."""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["TINYFISH_MOCK_MODE"] = "true"
+
+
+def result(name: str, value: float, unit: str, better: str = "lower") -> Dict:
+    """A single benchmark measurement; ``better`` is "lower" or "higher"."""
+    return {"name": name, "value": value, "unit": unit, "better": better}
+
+
+def median_ms(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Median wall time of ``fn`` in milliseconds after one warm-up call."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the executor's per-run prints so they don't skew timings."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def mock_latency(seconds: float) -> None:
+    """Fix the simulated TinyFish processing time, independent of prompt and output size."""
+    from app.core.config import settings
+    settings.TINYFISH_MOCK_LATENCY_MIN_S = seconds
+    settings.TINYFISH_MOCK_LATENCY_MAX_S = seconds
+    settings.TINYFISH_MOCK_PREFILL_MS_PER_TOKEN = 0.0
+    settings.TINYFISH_MOCK_DECODE_MS_PER_TOKEN = 0.0
+
+
+def reset_database() -> None:
+    """Recreate all tables. Only ever point the suite at a scratch database."""
+    from app.core.database import Base, engine
+    from app.models import models  # noqa: F401  (registers the tables)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def create_scenarios(count: int = 4) -> List[int]:
+    """Create one automation per two scenarios and return the scenario ids."""
+    from app.core.database import SessionLocal
+    from app.models.models import Automation, Scenario
+
+    db = SessionLocal()
+    try:
+        scenario_ids = []
+        for index in range(count):
+            if index % 2 == 0:
+                automation = Automation(
+                    name=f"bench-automation-{index // 2}",
+                    tinyfish_automation_id=f"bench_auto_{index // 2}",
+                    default_inputs={"model": "mock-model-v1"},
+                )
+                db.add(automation)
+                db.flush()
+            scenario = Scenario(
+                name=f"bench-scenario-{index}",
+                automation_id=automation.id,
+                inputs_template={"prompt": "benchmark"},
+                run_settings={},
+            )
+            db.add(scenario)
+            db.flush()
+            scenario_ids.append(scenario.id)
+        db.commit()
+        return scenario_ids
+    finally:
+        db.close()
+
+
+def insert_synthetic_runs(count: int, scenario_ids: List[int], seed: int = 0, chunk_size: int = 50_000) -> None:
+    """Bulk-insert ``count`` realistic finished runs using the bulk seeder."""
+    from bulk_seed import generate_runs, write_runs
+    from app.core.database import engine
+
+    with engine.begin() as connection:
+        for index, offset in enumerate(range(0, count, chunk_size)):
+            rows = generate_runs(min(chunk_size, count - offset), scenario_ids, seed=seed, chunk_index=index)
+            write_runs(connection, rows)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Performance benchmark suite for the platform itself.
+
+Runs against SQLite (default) or a scratch Postgres database with TinyFish
+mock mode, writes results as JSON, and optionally compares them with a
+baseline file, exiting non-zero when a metric regressed beyond the tolerance.
+
+    python benchmarks/suite.py --sizes 10000,100000,1000000
+    python benchmarks/suite.py --baseline benchmarks/results/baseline.json
+
+The database's tables are dropped and recreated, so never point
+--database-url at a database holding real data.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from common import DEFAULT_DATABASE_URL, configure
+
+BENCHMARKS = ("startup", "metrics", "trigger", "executor", "tenants", "serialization", "history")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, tolerance: float):
+    """Return (name, baseline, current, change) for metrics worse than tolerance."""
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["name"])
+        if before is None or before["value"] <= 0:
+            continue
+        change = (entry["value"] - before["value"]) / before["value"]
+        worse = change > tolerance if entry["better"] == "lower" else change < -tolerance
+        if worse:
+            regressions.append((entry["name"], before["value"], entry["value"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="Scratch database to benchmark against")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma-separated subset of {BENCHMARKS}")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Run history sizes for the query benchmarks")
+    parser.add_argument("--trigger-runs", type=int, default=300, help="Runs triggered in the throughput benchmark")
+    parser.add_argument("--output", help="Results file (default: results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    if args.database_url.startswith("sqlite:///"):
+        path = args.database_url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+    configure(args.database_url)
+
+    # Imported after configure() so the app picks up the benchmark settings
+    from bench_api import bench_executor_scaling, bench_tenant_isolation, bench_trigger_throughput
+    from bench_metrics_overhead import bench_metrics_overhead
+    from bench_startup import bench_startup
+    from bench_queries import bench_history_sizes
+    from bench_serialization import bench_serialization
+    from common import create_scenarios, reset_database
+
+    reset_database()
+    scenario_ids = create_scenarios()
+
+    results = []
+    if "startup" in selected:
+        results += bench_startup(args.database_url)
+    if "metrics" in selected:
+        results += bench_metrics_overhead()
+    if "trigger" in selected:
+        results += bench_trigger_throughput(scenario_ids, runs=args.trigger_runs)
+    if "executor" in selected:
+        results += bench_executor_scaling(scenario_ids)
+    if "tenants" in selected:
+        results += bench_tenant_isolation(scenario_ids)
+    if "serialization" in selected:
+        results += bench_serialization(scenario_ids)
+    if "history" in selected:
+        # Start from an empty runs table so the sizes are exact
+        reset_database()
+        scenario_ids = create_scenarios()
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        results += bench_history_sizes(scenario_ids, sizes=sizes)
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": args.database_url.split(":", 1)[0],
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for entry in results:
+        print(f"{entry['name']:40s} {entry['value']:14.2f} {entry['unit']}")
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before:.2f} -> {after:.2f} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Add multi-step scenario pipelines and per-step run records
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scenarios', sa.Column('steps', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    
+    op.create_table(
+        'run_steps',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('automation_id', sa.Integer(), nullable=True),
+        sa.Column('depends_on', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('start_offset_ms', sa.Float(), nullable=True),
+        sa.Column('duration_ms', sa.Float(), nullable=True),
+        sa.Column('ttft_ms', sa.Float(), nullable=True),
+        sa.Column('input_tokens', sa.Integer(), nullable=True),
+        sa.Column('output_tokens', sa.Integer(), nullable=True),
+        sa.Column('on_critical_path', sa.Boolean(), nullable=False),
+        sa.Column('timing_breakdown', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('response_json', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['run_id'], ['runs.id'], ),
+        sa.ForeignKeyConstraint(['automation_id'], ['automations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_run_steps_id'), 'run_steps', ['id'], unique=False)
+    op.create_index(op.f('ix_run_steps_run_id'), 'run_steps', ['run_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_run_steps_run_id'), table_name='run_steps')
+    op.drop_index(op.f('ix_run_steps_id'), table_name='run_steps')
+    op.drop_table('run_steps')
+    
+    op.drop_column('scenarios', 'steps')
@@ -0,0 +1,28 @@
+"""Add sweep membership and grid point to runs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('runs', sa.Column('sweep_id', sa.String(length=64), nullable=True))
+    op.add_column('runs', sa.Column('sweep_params', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    op.create_index(op.f('ix_runs_sweep_id'), 'runs', ['sweep_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_runs_sweep_id'), table_name='runs')
+    op.drop_column('runs', 'sweep_params')
+    op.drop_column('runs', 'sweep_id')
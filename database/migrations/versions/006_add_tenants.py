@@ -0,0 +1,52 @@
+"""Add tenants owning automations and scenarios
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tenants',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.Column('max_concurrent_runs', sa.Integer(), nullable=True),
+        sa.Column('runs_per_minute', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_tenants_id'), 'tenants', ['id'], unique=False)
+    
+    op.add_column('automations', sa.Column('tenant_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_automations_tenant_id', 'automations', 'tenants', ['tenant_id'], ['id'])
+    op.create_index(op.f('ix_automations_tenant_id'), 'automations', ['tenant_id'], unique=False)
+    
+    op.add_column('scenarios', sa.Column('tenant_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_scenarios_tenant_id', 'scenarios', 'tenants', ['tenant_id'], ['id'])
+    op.create_index(op.f('ix_scenarios_tenant_id'), 'scenarios', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scenarios_tenant_id'), table_name='scenarios')
+    op.drop_constraint('fk_scenarios_tenant_id', 'scenarios', type_='foreignkey')
+    op.drop_column('scenarios', 'tenant_id')
+    
+    op.drop_index(op.f('ix_automations_tenant_id'), table_name='automations')
+    op.drop_constraint('fk_automations_tenant_id', 'automations', type_='foreignkey')
+    op.drop_column('automations', 'tenant_id')
+    
+    op.drop_index(op.f('ix_tenants_id'), table_name='tenants')
+    op.drop_table('tenants')
@@ -1,6 +1,17 @@
 // TypeScript types for API entities
+export interface Tenant {
+  id: number;
+  name: string;
+  weight: number;
+  max_concurrent_runs?: number;
+  runs_per_minute?: number;
+  created_at: string;
+  updated_at?: string;
+}
+
 export interface Automation {
   id: number;
+  tenant_id?: number;
   name: string;
   tinyfish_automation_id: string;
   description?: string;
@@ -9,6 +20,13 @@ export interface Automation {
   updated_at?: string;
 }
 
+export interface ScenarioStep {
+  name: string;
+  automation_id?: number;
+  inputs_template?: Record<string, any>;
+  depends_on?: string[];
+}
+
 export interface Scenario {
   id: number;
   name: string;
@@ -16,6 +34,8 @@ export interface Scenario {
   description?: string;
   inputs_template?: Record<string, any>;
   run_settings?: Record<string, any>;
+  steps?: ScenarioStep[];
+  tenant_id?: number;
   created_at: string;
   updated_at?: string;
 }
@@ -29,12 +49,36 @@ export interface Run {
   total_duration_ms?: number;
   ttft_ms?: number;
   inter_token_stats?: Record<string, any>;
+  timing_breakdown?: Record<string, number>;
+  samples?: Record<string, any>;
+  sweep_id?: string;
+  sweep_params?: Record<string, any>;
   error?: string;
   tinyfish_run_id?: string;
   response_json?: Record<string, any>;
   created_at: string;
 }
 
+export interface RunStep {
+  id: number;
+  run_id: number;
+  name: string;
+  automation_id?: number;
+  depends_on?: string[];
+  status: string;
+  started_at?: string;
+  finished_at?: string;
+  start_offset_ms?: number;
+  duration_ms?: number;
+  ttft_ms?: number;
+  input_tokens?: number;
+  output_tokens?: number;
+  on_critical_path: boolean;
+  timing_breakdown?: Record<string, number>;
+  error?: string;
+  response_json?: Record<string, any>;
+}
+
 export interface PercentileStats {
   p50?: number;
   p95?: number;
@@ -47,6 +91,7 @@ export interface DashboardKPIs {
   total_time_stats: PercentileStats;
   ttft_stats?: PercentileStats;
   avg_inter_token_latency?: number;
+  timing_breakdown_stats: Record<string, PercentileStats>;
   recent_runs: Run[];
 }
 
@@ -56,6 +101,7 @@ export interface TriggerRunRequest {
 }
 
 export interface CreateAutomationRequest {
+  tenant_id?: number;
   name: string;
   tinyfish_automation_id: string;
   description?: string;
@@ -152,9 +198,14 @@ export const api = {
     return fetchAPI<Run>(`/runs/${id}`);
   },
 
-  async triggerRun(scenarioId: number, inputsOverride?: Record<string, any>): Promise<Run> {
+  async triggerRun(
+    scenarioId: number,
+    inputsOverride?: Record<string, any>,
+    idempotencyKey?: string
+  ): Promise<Run> {
     return fetchAPI<Run>('/runs/trigger', {
       method: 'POST',
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
       body: JSON.stringify({
         scenario_id: scenarioId,
         inputs_override: inputsOverride,